@@ -0,0 +1,8 @@
+"""
+Epistemic momentum, the shared engines behind the experiment scripts
+"""
+
+from .evidence import Evidence, ReevaluationOfPriorEvidence, normalize
+from .ratios import Lookback, RatioItem, log_ratio, probability
+from .runs import Run, RunStream
+from .targets import Window
@@ -0,0 +1,147 @@
+"""
+epistemic-momentum, one entry point for every experiment
+
+    epistemic-momentum run baseline            output/results.txt of baseline
+    epistemic-momentum run 3.1g                by thesis ID
+    epistemic-momentum run my_variant.json     any scenario file
+    epistemic-momentum list
+    epistemic-momentum sweep switching --grid likelihood=.49,.4,.35 --grid p=10,20 --grid iterations=200
+
+Only the standard library is imported up front. NumPy comes in with the scenario
+compiler when a scenario is run, and scripts bring their own imports, so listing
+or a bad name costs no more than starting Python. There is no banner.
+"""
+
+import argparse
+import os
+import sys
+
+from . import registry
+
+
+def run(name, mode="reference", output="output"):
+    """
+    run one experiment and return the paths of the results it wrote, a scenario
+    writes results.txt under output, a script is run through its main() and writes
+    output/ in the current directory (simple_calc only prints), a script's kernel
+    (registry.KERNEL_EXPERIMENTS) writes results.txt under output in log space
+    """
+    kind, path = registry.find(name)
+    if kind == "script":
+        import runpy
+
+        scripts = os.path.dirname(path)
+        if scripts not in sys.path:
+            sys.path.insert(0, scripts)
+        # run as a module rather than as __main__, then its main() without the banner,
+        # RUNS times for the experiments that are a number of runs
+        script = runpy.run_path(path, run_name=os.path.splitext(os.path.basename(path))[0])
+        written = [script["main"](banner=False) for i in range(script.get("RUNS", 1))]
+        return [results for results in written if results is not None]
+
+    from .stream import write_results
+
+    os.makedirs(output, exist_ok=True)
+    results = os.path.join(output, "results.txt")
+    if kind == "kernel":
+        from . import sweep
+
+        write_results(results, *getattr(sweep, path)())
+        return [results]
+
+    from . import scenario
+
+    compiled = scenario.load(path)
+    write_results(results, *[iter(column) for column in compiled.run(mode)], cell=compiled.cell)
+    return [results]
+
+
+def value(text):
+    """
+    a grid value from the command line, an int, a float or none
+    """
+    if text.lower() == "none":
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def grid(specs):
+    """
+    name -> values from NAME=V1,V2,... arguments
+    """
+    result = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if not name or not values:
+            raise ValueError("expected NAME=V1,V2,... got {}".format(spec))
+        result[name] = [value(v) for v in values.split(",")]
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="epistemic-momentum", description="Run epistemic momentum experiments")
+    commands = parser.add_subparsers(dest="command")
+
+    run_parser = commands.add_parser("run", help="run an experiment by name, thesis ID or scenario file")
+    run_parser.add_argument("scenario")
+    run_parser.add_argument("--mode", choices=("reference", "fast"),
+                            help="reference (the default) reproduces the BayesItem floats of results.txt, fast is "
+                                 "the vectorized engine (scenarios only)")
+    run_parser.add_argument("--output", help="directory for results.txt, output by default (scenarios only)")
+
+    commands.add_parser("list", help="list the experiments and thesis IDs")
+
+    sweep_parser = commands.add_parser("sweep", help="run a kernel over a parameter grid across worker processes")
+    sweep_parser.add_argument("kernel", help="switching (baseline_two_vars) or windowed (prior_n_e lookback)")
+    sweep_parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2,...",
+                              help="values of one kernel argument, repeat for every argument")
+    sweep_parser.add_argument("--seed", type=int, help="seed of the per point generators")
+    sweep_parser.add_argument("--workers", type=int, help="worker processes, every CPU by default")
+    sweep_parser.add_argument("--chunksize", type=int, help="grid points per task")
+    sweep_parser.add_argument("--output", default="sweep.txt", help="file for the matrix, a line per point")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        try:
+            kind, _ = registry.find(args.scenario)
+        except KeyError as e:
+            parser.error(e.args[0])
+        if kind == "script" and (args.mode or args.output):
+            parser.error("{} is a script, it always runs the reference engine and writes output/ in the current "
+                         "directory, --mode and --output are for scenarios".format(args.scenario))
+        if kind == "kernel" and args.mode:
+            parser.error("{} runs from its kernel in momentum.sweep, which has no --mode".format(args.scenario))
+        for path in run(args.scenario, args.mode or "reference", args.output or "output"):
+            print(path)
+    elif args.command == "sweep":
+        from . import sweep
+
+        if args.kernel not in sweep.KERNELS:
+            parser.error("no kernel called {}, expected one of {}".format(args.kernel, ", ".join(sweep.KERNELS)))
+        try:
+            values = grid(args.grid)
+            sweep.check(sweep.KERNELS[args.kernel], values)
+        except ValueError as e:
+            parser.error(e.args[0])
+        if args.kernel == "windowed" and set(values) <= {"window", "stride", "iterations"}:
+            # a window and stride grid is one shared pass, no pool needed
+            result = sweep.window_sweep(values)
+        else:
+            result = sweep.sweep(sweep.KERNELS[args.kernel], values, args.seed, args.workers, args.chunksize)
+        sweep.write_matrix(args.output, result)
+        print(args.output)
+    elif args.command == "list":
+        aliases = {}
+        for alias, name in registry.ALIASES.items():
+            aliases.setdefault(name, []).append(alias)
+        for kind, found in (("scenario", registry.scenarios()), ("script", registry.scripts()),
+                            ("kernel", registry.kernels())):
+            for name in found:
+                print("{:32} {:8} {}".format(name, kind, " ".join(aliases.get(name, []))).rstrip())
+    else:
+        parser.print_help()
+        return 2
+    return 0
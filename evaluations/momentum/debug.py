@@ -0,0 +1,86 @@
+"""
+The debug dumps the scripts write next to results.txt
+
+output_raw_debug.txt is a Trace of reference.lookback(), one line per replayed item
+and per step ("i,update_count,likelihood_h_1,prior_h_1,posterior_h_1,prior_h_2,
+posterior_h_2", update_count 000 for the step itself) after the evidence being
+processed. output_evidence.txt is every Evidence as a dict and output_reevals.txt
+every reevaluation a column causes.
+"""
+
+from .targets import expand, expanded
+
+RAW_HEADER = "i,iter,likelihood_h_1,prior_h_1,b.posterior_h_1,prior_h_2,posterior_h_2"
+REEVALS_HEADER = "causing_evidence_postion, prior_evidence_positions_to_be_updated, variance_h_1, variance_h_2"
+
+
+def line(i, update_count, likelihood_h_1, prior_h_1, posterior_h_1, prior_h_2, posterior_h_2):
+    return ("{0:03d}".format(i) + "," +
+            "{0:03d}".format(update_count) + "," +
+            str(likelihood_h_1) + "," +
+            "{:5f}".format(prior_h_1) + "," +
+            "{:5f}".format(posterior_h_1) + "," +
+            "{:5f}".format(prior_h_2) + "," +
+            "{:5f}".format(posterior_h_2))
+
+
+class Trace:
+    """
+    Collects the debug lines of one or more lookbacks, evidence=False leaves out the
+    evidence dicts, replays=False the replayed items (the baseline scripts only keep
+    the steps) and positions limits the trace to some causing positions
+    """
+
+    def __init__(self, evidence=True, replays=True, positions=None):
+        self.lines = []
+        self.with_evidence = evidence
+        self.with_replays = replays
+        self.positions = positions
+
+    def wants(self, position):
+        return self.positions is None or position in self.positions
+
+    def evidence(self, evidence):
+        if self.with_evidence:
+            self.lines.append(expanded(evidence))
+
+    def replay(self, i, update_count, likelihood_h_1, prior_h_1, posterior_h_1, prior_h_2, posterior_h_2):
+        if self.with_replays:
+            self.lines.append(line(i, update_count, likelihood_h_1, prior_h_1, posterior_h_1, prior_h_2, posterior_h_2))
+
+    def step(self, item):
+        self.lines.append(line(item.position, 0, item.likelihood_h_1, item.prior_h_1, item.posterior_h_1,
+                               item.prior_h_2, item.posterior_h_2))
+
+
+def write_raw(path, lines, header=None):
+    """
+    output_raw_debug.txt, the baseline scripts start it with RAW_HEADER
+    """
+    with open(path, "w") as f:
+        if header is not None:
+            f.write(header)
+        for o in lines:
+            f.write(str(o) + "\n")
+
+
+def write_evidence(path, *columns):
+    """
+    output_evidence.txt, the evidences of every column in turn
+    """
+    with open(path, "w") as f:
+        for evidences in columns:
+            for e in evidences:
+                f.write(str(expanded(e)) + "\n")
+
+
+def write_reevaluations(path, evidences):
+    """
+    output_reevals.txt, a line for every evidence of the column that reevaluates
+    """
+    with open(path, "w") as f:
+        f.write(REEVALS_HEADER)
+        for e in evidences:
+            if e.prior_evidence_positions_to_be_updated:
+                f.write(str(e.position) + "," + str(expand(e.prior_evidence_positions_to_be_updated)) + "," +
+                        str(e.reevaluation_likelihood_h_1) + "," + str(e.reevaluation_likelihood_h_2) + "\n")
@@ -0,0 +1,101 @@
+"""
+One entry point, two engines
+
+mode="reference" runs the BayesItem arithmetic of the scripts (momentum.reference),
+mode="fast" the vectorized log space engine (momentum.vectorized). compare() holds
+one against the other on the two things the figures depend on: the largest
+difference in posterior_h_1, and the cells of output/results.txt that would come out
+differently once written with "{:5f}".
+"""
+
+import math
+
+MODES = ("reference", "fast")
+
+
+def _engine(mode):
+    if mode == "reference":
+        from . import reference
+        return reference
+    if mode == "fast":
+        from . import vectorized
+        return vectorized
+    raise ValueError("unknown mode {}, expected one of {}".format(mode, ", ".join(MODES)))
+
+
+def bayes(likelihood_h_1, prior_h_1, likelihood_h_2, prior_h_2, iterations, mode="reference"):
+    """
+    straight iterative bayes calculation, where priors become the previous posterior
+    """
+    return _engine(mode).bayes(likelihood_h_1, prior_h_1, likelihood_h_2, prior_h_2, iterations)
+
+
+def lookback(evidences, mode="reference"):
+    """
+    For the reevaluation of previous evidence
+    """
+    return _engine(mode).lookback(evidences)
+
+
+class Comparison:
+    """
+    How far a fast run is from the reference run
+    """
+
+    def __init__(self, divergence, position, mismatches, length):
+        self.divergence = divergence
+        self.position = position
+        self.mismatches = mismatches
+        self.length = length
+
+    @property
+    def agrees(self):
+        """
+        true when every written cell is the same
+        """
+        return not self.mismatches
+
+    def __repr__(self):
+        return "Comparison(divergence={}, position={}, mismatches={}, length={})".format(
+            self.divergence, self.position, len(self.mismatches), self.length)
+
+
+def compare(reference_items, fast_items, cell="{:5f}"):
+    """
+    max |posterior_h_1| difference (and where it first is, inf where one run has a
+    nan) plus the positions whose written cell differs, the runs must be the same
+    length
+    """
+    if len(reference_items) != len(fast_items):
+        raise ValueError("cannot compare runs of {} and {} items".format(len(reference_items), len(fast_items)))
+    divergence = 0.0
+    position = None
+    mismatches = []
+    for i in range(len(reference_items)):
+        expected = float(reference_items[i].posterior_h_1)
+        actual = float(fast_items[i].posterior_h_1)
+        difference = abs(expected - actual)
+        if not math.isfinite(difference):
+            # a nan on either side is as far apart as the runs can be, not a
+            # comparison that is always false
+            difference = math.inf
+        if difference > divergence:
+            divergence = difference
+            position = i
+        if cell.format(expected) != cell.format(actual):
+            mismatches.append(i)
+    return Comparison(divergence, position, mismatches, len(reference_items))
+
+
+def check(evidences, cell="{:5f}"):
+    """
+    lookback in both modes, compared. Opposing certainties agree too, BayesItem's
+    0 / 0 after them is the fast engine's nan read as 0:
+
+    >>> from momentum.evidence import Evidence
+    >>> check([Evidence(i, l_1, l_2, .5, .5, [], .5, .5)
+    ...        for i, (l_1, l_2) in enumerate([(1, 0), (0, 1), (.6, .4), (0, 0)])])
+    Comparison(divergence=0.0, position=None, mismatches=0, length=4)
+    """
+    evidences = list(evidences)
+    return compare(lookback(evidences, "reference"), lookback(evidences, "fast"), cell)
@@ -0,0 +1,36 @@
+"""
+The evidence model shared by every engine: a piece of evidence E, the reevaluation
+it may cause of prior evidence, and the clamping applied to reevaluated likelihoods
+"""
+
+
+class Evidence:
+    """
+    Basic unit of this model, iterations of evidence E
+    """
+
+    def __init__(self, position, likelihood_h_1, likelihood_h_2, prior_h_1, prior_h_2, prior_evidence_positions_to_be_updated, reevaluation_likelihood_h_1, reevaluation_likelihood_h_2):
+        self.position = position
+        self.likelihood_h_1 = likelihood_h_1
+        self.likelihood_h_2 = likelihood_h_2
+        self.prior_h_1 = prior_h_1
+        self.prior_h_2 = prior_h_2
+        self.prior_evidence_positions_to_be_updated = prior_evidence_positions_to_be_updated
+        self.reevaluation_likelihood_h_1 = reevaluation_likelihood_h_1
+        self.reevaluation_likelihood_h_2 = reevaluation_likelihood_h_2
+
+
+class ReevaluationOfPriorEvidence:
+    def __init__(self, causing_evidence_postion, prior_evidence_positions_to_be_updated, variance_h_1, variance_h_2):
+        self.causing_evidence_postion = causing_evidence_postion
+        self.prior_evidence_positions_to_be_updated = prior_evidence_positions_to_be_updated
+        self.variance_h_1 = variance_h_1
+        self.variance_h_2 = variance_h_2
+
+
+def normalize(n):
+    if n > 1:
+        n = 1
+    if n < 0:
+        n = 0
+    return n
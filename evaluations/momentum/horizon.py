@@ -0,0 +1,123 @@
+"""
+Long horizon runs, 10^6 to 10^8 steps and beyond
+
+Beliefs stay in log odds the whole way. The running sum is carried chunk by chunk
+with a compensated (Neumaier) offset so rounding does not build up over the run, and
+only every n-th step is kept so memory is set by the sample count, not the horizon.
+Alongside the curve we report the first step at which the probability output would
+have saturated, i.e. where float64 P(H_1) or P(H_2) rounds to exactly 1.0 and the
+pair based BayesItem engine could no longer be moved by later evidence.
+"""
+
+import numpy as np
+
+from .vectorized import log_ratio, probability
+
+CHUNK = 1 << 16
+
+
+class Horizon:
+    """
+    The sampled log odds of a long run
+    """
+
+    def __init__(self, positions, log_odds, final, saturated_at, iterations):
+        self.positions = positions
+        self.log_odds = log_odds
+        self.final = final
+        self.saturated_at = saturated_at
+        self.iterations = iterations
+
+    @property
+    def posterior_h_1(self):
+        return probability(self.log_odds)
+
+    @property
+    def posterior_h_2(self):
+        return probability(-self.log_odds)
+
+
+def saturated(log_odds):
+    """
+    true where float64 probability output of the log odds is pinned at 0.0 or 1.0
+    """
+    return probability(np.abs(log_odds)) == 1.0
+
+
+def long_horizon(log_ratios, prior_log_odds=0.0, every=1):
+    """
+    run an arbitrarily long sequence of log likelihood ratios, given either as one
+    array or as an iterable of arrays (chunks), keeping every n-th posterior
+    """
+    if isinstance(log_ratios, np.ndarray):
+        values = log_ratios
+        log_ratios = (values[start:start + CHUNK] for start in range(0, len(values), CHUNK))
+
+    total = float(prior_log_odds)
+    compensation = 0.0
+    saturated_at = None
+    positions = []
+    samples = []
+    position = 0
+    for chunk in log_ratios:
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if not len(chunk):
+            continue
+        curve = np.cumsum(chunk)
+        curve += total + compensation
+
+        if saturated_at is None:
+            hits = np.flatnonzero(saturated(curve))
+            if len(hits):
+                saturated_at = position + int(hits[0])
+
+        first = (-position) % every
+        positions.append(np.arange(position + first, position + len(chunk), every))
+        samples.append(curve[first::every])
+
+        # Neumaier step on the pairwise chunk sum, total + compensation stays within
+        # a few ulp of the exact running sum however many chunks there are
+        step = float(np.sum(chunk))
+        t = total + step
+        if abs(total) >= abs(step):
+            compensation += (total - t) + step
+        else:
+            compensation += (step - t) + total
+        total = t
+        position += len(chunk)
+
+    positions = np.concatenate(positions) if positions else np.empty(0, dtype=np.int64)
+    samples = np.concatenate(samples) if samples else np.empty(0)
+    return Horizon(positions, samples, total + compensation, saturated_at, position)
+
+
+def constant_horizon(likelihood_h_1, likelihood_h_2, iterations, prior_h_1=.5, prior_h_2=.5, every=1):
+    """
+    long_horizon for a constant likelihood pair, in closed form, the work is only
+    the samples that are kept
+    """
+    prior = float(log_ratio(prior_h_1, prior_h_2))
+    step = float(log_ratio(likelihood_h_1, likelihood_h_2))
+    positions = np.arange(0, iterations, every, dtype=np.int64)
+    log_odds = prior + step * (positions + 1).astype(np.float64)
+
+    # once prior + step * (i + 1) has the sign of step its magnitude only grows, so
+    # past the first step the first saturated one can be found by bisection
+    saturated_at = None
+    if iterations and saturated(prior + step):
+        saturated_at = 0
+    elif iterations and step != 0:
+        def past(i):
+            x = prior + step * (i + 1)
+            return x * step > 0 and saturated(x)
+
+        if past(iterations - 1):
+            low, high = 0, iterations - 1
+            while low < high:
+                middle = (low + high) // 2
+                if past(middle):
+                    high = middle
+                else:
+                    low = middle + 1
+            saturated_at = low
+    return Horizon(positions, log_odds, prior + step * iterations, saturated_at, iterations)
@@ -0,0 +1,124 @@
+"""
+K competing hypotheses instead of the hard coded h_1/h_2 pair
+
+Every piece of evidence carries a vector of likelihoods, one per hypothesis, and
+beliefs are kept as unnormalized log weights. An update adds the log likelihoods,
+so a run is a cumulative sum down the steps, and each step is normalized once with
+a log-sum-exp when the posterior is read. With K = 2 this is the ratio engine.
+"""
+
+import numpy as np
+
+from . import targets
+from .vectorized import combine, split
+
+
+class MultiEvidence:
+    """
+    Evidence E over K hypotheses, likelihoods and priors are length K vectors
+    """
+
+    def __init__(self, position, likelihoods, priors, prior_evidence_positions_to_be_updated, reevaluation_likelihoods):
+        self.position = position
+        self.likelihoods = np.asarray(likelihoods, dtype=np.float64)
+        self.priors = np.asarray(priors, dtype=np.float64)
+        self.prior_evidence_positions_to_be_updated = prior_evidence_positions_to_be_updated
+        self.reevaluation_likelihoods = np.asarray(reevaluation_likelihoods, dtype=np.float64)
+
+    @classmethod
+    def from_evidence(cls, evidence):
+        """
+        the two hypothesis Evidence as a K = 2 MultiEvidence
+        """
+        return cls(evidence.position,
+                   [evidence.likelihood_h_1, evidence.likelihood_h_2],
+                   [evidence.prior_h_1, evidence.prior_h_2],
+                   evidence.prior_evidence_positions_to_be_updated,
+                   [evidence.reevaluation_likelihood_h_1, evidence.reevaluation_likelihood_h_2])
+
+
+class Beliefs:
+    """
+    Normalized log posteriors of a run, one row per step and one column per hypothesis
+    """
+
+    def __init__(self, log_posterior):
+        self.log_posterior = log_posterior
+
+    @property
+    def posterior(self):
+        return np.exp(self.log_posterior)
+
+    @property
+    def hypotheses(self):
+        return self.log_posterior.shape[1]
+
+    def __len__(self):
+        return self.log_posterior.shape[0]
+
+    def __getitem__(self, i):
+        return np.exp(self.log_posterior[i])
+
+
+def log(x):
+    with np.errstate(divide="ignore"):
+        return np.log(np.asarray(x, dtype=np.float64))
+
+
+def log_normalize(log_weights):
+    """
+    log of weights / sum(weights) along the last axis, without leaving log space
+    """
+    log_weights = np.asarray(log_weights, dtype=np.float64)
+    top = np.max(log_weights, axis=-1, keepdims=True)
+    if np.any(np.isneginf(top)):
+        raise ValueError("every hypothesis has a likelihood of zero")
+    return log_weights - (top + np.log(np.sum(np.exp(log_weights - top), axis=-1, keepdims=True)))
+
+
+def bayes(likelihoods, priors, iterations):
+    """
+    straight iterative bayes calculation with one constant likelihood vector
+    """
+    steps = np.arange(1, iterations + 1, dtype=np.float64)[:, None]
+    return Beliefs(log_normalize(log(priors) + steps * log(likelihoods)))
+
+
+def iterative(likelihoods, priors):
+    """
+    bayes over a (steps x K) matrix of likelihoods, one row per piece of evidence
+    """
+    return Beliefs(log_normalize(log(priors) + np.cumsum(log(likelihoods), axis=0)))
+
+
+def lookback(evidences):
+    """
+    For the reevaluation of previous evidence
+
+    A replay of the earlier evidence is the first prior plus the prefix sum of the
+    log likelihoods, corrected on the reevaluated positions only.
+    """
+    evidences = [e if isinstance(e, MultiEvidence) else MultiEvidence.from_evidence(e) for e in evidences]
+    if not evidences:
+        raise ValueError("lookback needs at least one piece of evidence")
+    steps = log([e.likelihoods for e in evidences])
+    parts = np.array(split(steps))
+    prefix = np.zeros((3, len(steps) + 1, steps.shape[1]))
+    np.cumsum(parts, axis=1, out=prefix[:, 1:])
+
+    start = log(evidences[0].priors)
+    log_posterior = np.empty_like(steps)
+    prior = start
+    for i, evidence in enumerate(evidences):
+        reevaluation = targets.resolve(evidence.prior_evidence_positions_to_be_updated, i)
+        if i and len(reevaluation):
+            positions = np.flatnonzero(targets.mask(reevaluation, i))
+            reevaluated = np.array(split(log(np.clip(evidence.reevaluation_likelihoods, 0, 1))))
+            # a likelihood of zero is a step of -inf in every prefix after it, so it
+            # is counted apart rather than subtracted back out (see vectorized.split)
+            finite, up, down = prefix[:, i] + len(positions) * reevaluated - np.sum(parts[:, positions], axis=1)
+            prior = combine(start + finite, up, down)
+        log_posterior[i] = prior + steps[i]
+        prior = log_posterior[i]
+
+    return Beliefs(log_normalize(log_posterior))
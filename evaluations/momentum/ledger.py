@@ -0,0 +1,154 @@
+"""
+Evidence ledger, the log likelihood ratios of a whole history in a segment tree
+
+Point updates, range assignment and prefix queries are all O(log n), so scattered
+reevaluations of a long history (chicken_little.py's big_reevaluations, the every
+5th/13th/26th/51st items of prior_2_e.py) answer the belief at the current step
+without replaying anything.
+"""
+
+from .evidence import normalize
+from .ratios import log_ratio, probability
+from .targets import clip
+
+
+class EvidenceLedger:
+    """
+    Log ratios of evidence 0..n-1 in a segment tree with lazy range assignment
+    """
+
+    def __init__(self, prior_h_1=.5, prior_h_2=.5, capacity=1024):
+        self.start = log_ratio(prior_h_1, prior_h_2)
+        self.length = 0
+        self._build([], capacity)
+
+    def _build(self, values, capacity):
+        size = 1
+        while size < max(capacity, 1):
+            size *= 2
+        self.size = size
+        self.total = [0.0] * (2 * size)
+        self.pending = [None] * (2 * size)
+        for position, value in enumerate(values):
+            self.total[size + position] = value
+        for node in range(size - 1, 0, -1):
+            self.total[node] = self.total[2 * node] + self.total[2 * node + 1]
+
+    def _push(self, node, width):
+        value = self.pending[node]
+        if value is not None:
+            for child in (2 * node, 2 * node + 1):
+                self.pending[child] = value
+                self.total[child] = value * (width // 2)
+            self.pending[node] = None
+
+    def _assign(self, node, low, high, start, stop, value):
+        if stop <= low or high <= start:
+            return
+        if start <= low and high <= stop:
+            self.total[node] = value * (high - low)
+            if high - low > 1:
+                self.pending[node] = value
+            return
+        self._push(node, high - low)
+        middle = (low + high) // 2
+        self._assign(2 * node, low, middle, start, stop, value)
+        self._assign(2 * node + 1, middle, high, start, stop, value)
+        self.total[node] = self.total[2 * node] + self.total[2 * node + 1]
+
+    def _sum(self, node, low, high, start, stop):
+        if stop <= low or high <= start:
+            return 0.0
+        if start <= low and high <= stop:
+            return self.total[node]
+        value = self.pending[node]
+        if value is not None:
+            return value * (min(stop, high) - max(start, low))
+        middle = (low + high) // 2
+        return self._sum(2 * node, low, middle, start, stop) + self._sum(2 * node + 1, middle, high, start, stop)
+
+    def _leaf(self, position):
+        node, low, high = 1, 0, self.size
+        while high - low > 1:
+            self._push(node, high - low)
+            middle = (low + high) // 2
+            if position < middle:
+                node, high = 2 * node, middle
+            else:
+                node, low = 2 * node + 1, middle
+        return self.total[node]
+
+    def _check(self, position):
+        if not 0 <= position < self.length:
+            raise IndexError("no evidence at position {}".format(position))
+
+    def __len__(self):
+        return self.length
+
+    def append(self, likelihood_h_1, likelihood_h_2):
+        if self.length == self.size:
+            self._build([self._leaf(position) for position in range(self.length)], 2 * self.size)
+        self.length += 1
+        self._assign(1, 0, self.size, self.length - 1, self.length, log_ratio(likelihood_h_1, likelihood_h_2))
+
+    def update(self, position, likelihood_h_1, likelihood_h_2):
+        """
+        reevaluate one earlier piece of evidence
+        """
+        self._check(position)
+        self._assign(1, 0, self.size, position, position + 1, log_ratio(likelihood_h_1, likelihood_h_2))
+
+    def assign(self, start, stop, likelihood_h_1, likelihood_h_2):
+        """
+        reevaluate evidence start..stop-1 to the same likelihood pair
+        """
+        start = max(start, 0)
+        stop = min(stop, self.length)
+        if start < stop:
+            self._assign(1, 0, self.size, start, stop, log_ratio(likelihood_h_1, likelihood_h_2))
+
+    def log_ratio(self, position):
+        self._check(position)
+        return self._leaf(position)
+
+    def prefix(self, stop):
+        """
+        sum of the log ratios of evidence 0..stop-1
+        """
+        return self._sum(1, 0, self.size, 0, min(max(stop, 0), self.length))
+
+    def log_odds(self, position):
+        """
+        posterior log odds after the evidence at position
+        """
+        self._check(position)
+        return self.start + self.prefix(position + 1)
+
+    def belief(self, position):
+        """
+        posterior_h_1 after the evidence at position
+        """
+        return probability(self.log_odds(position))
+
+    def replay(self, stop, targets, likelihood_h_1, likelihood_h_2):
+        """
+        lookback's prior for evidence stop: evidence 0..stop-1 replayed from the first
+        prior with the targets reevaluated, without changing the ledger
+        """
+        reevaluated = log_ratio(normalize(likelihood_h_1), normalize(likelihood_h_2))
+        stop = min(stop, self.length)
+        if isinstance(targets, range) and targets.step == 1:
+            span = clip(targets, stop)
+            if not len(span):
+                return self.start + self.prefix(stop)
+            return (self.start + self._sum(1, 0, self.size, 0, span.start) + len(span) * reevaluated +
+                    self._sum(1, 0, self.size, span.stop, stop))
+
+        # the evidence between the targets is summed as ranges rather than the targets
+        # being taken back out of a prefix, which is inf - inf for a log ratio of +-inf
+        prior = self.start
+        previous = 0
+        for position in sorted(position for position in set(targets) if 0 <= position < stop):
+            prior += self._sum(1, 0, self.size, previous, position) + reevaluated
+            previous = position + 1
+        return prior + self._sum(1, 0, self.size, previous, stop)
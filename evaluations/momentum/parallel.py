@@ -0,0 +1,90 @@
+"""
+Parallel prefix execution of one long evidence sequence
+
+A chain of bayes updates is a running sum of log likelihood ratios, and addition is
+associative, so the sequence is run as a two pass scan over chunks:
+
+    1. every worker reduces its chunk to the sum of its log ratios
+    2. the chunk sums are added up in order, giving the log odds each chunk starts at
+    3. every worker runs its chunk again from that offset, keeping every n-th step
+
+Workers build their chunk's likelihoods themselves from the source (a
+PiecewiseSchedule, or anything else with likelihoods(start, stop)) so no per step
+data crosses a process boundary. Likelihoods are clamped to 0..1 as normalize()
+does. A zero likelihood gives an infinite log ratio, which carries through the scan
+like the pinned 0.0 or 1.0 of the pair engine. Where a +inf meets a -inf, or both
+likelihoods are zero, the sum is nan from there on, which is read as posteriors of
+0 and 0, the pair BayesItem keeps after its 0 / 0 (see ratios.probability). The
+offsets are kept with a compensated sum while they are finite.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .horizon import Horizon, saturated
+from .vectorized import log_ratio
+
+
+def _steps(source, start, stop):
+    likelihood_h_1, likelihood_h_2 = source.likelihoods(start, stop)
+    return log_ratio(np.clip(likelihood_h_1, 0, 1), np.clip(likelihood_h_2, 0, 1))
+
+
+def _reduce(source, start, stop):
+    with np.errstate(invalid="ignore"):
+        return float(np.sum(_steps(source, start, stop)))
+
+
+def _finalize(source, start, stop, offset, every):
+    with np.errstate(invalid="ignore"):
+        curve = offset + np.cumsum(_steps(source, start, stop))
+    hits = np.flatnonzero(saturated(curve))
+    first = (-start) % every
+    return curve[first::every], (start + int(hits[0]) if len(hits) else None), float(curve[-1])
+
+
+def offsets(sums, prior_log_odds=0.0):
+    """
+    the log odds each chunk starts from, a compensated running sum of the chunk sums
+    """
+    total = float(prior_log_odds)
+    compensation = 0.0
+    result = []
+    for step in sums:
+        result.append(total + compensation)
+        t = total + step
+        if np.isfinite(t):
+            if abs(total) >= abs(step):
+                compensation += (total - t) + step
+            else:
+                compensation += (step - t) + total
+        else:
+            compensation = 0.0
+        total = t
+    return result, total + compensation
+
+
+def parallel_horizon(source, iterations, prior_h_1=.5, prior_h_2=.5, every=1, workers=None, chunks=None):
+    """
+    the first iterations steps of the source as a Horizon, scanned across worker
+    processes, chunks defaults to four per worker
+    """
+    workers = workers or os.cpu_count() or 1
+    prior = float(log_ratio(prior_h_1, prior_h_2))
+    if iterations <= 0:
+        return Horizon(np.empty(0, dtype=np.int64), np.empty(0), prior, None, 0)
+    chunks = max(1, min(chunks or 4 * workers, iterations))
+    bounds = [iterations * k // chunks for k in range(chunks + 1)]
+    starts, stops = bounds[:-1], bounds[1:]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        sums = list(pool.map(_reduce, [source] * chunks, starts, stops))
+        starting, _ = offsets(sums, prior)
+        parts = list(pool.map(_finalize, [source] * chunks, starts, stops, starting, [every] * chunks))
+
+    hits = [hit for _, hit, _ in parts if hit is not None]
+    return Horizon(np.arange(0, iterations, every, dtype=np.int64),
+                   np.concatenate([curve for curve, _, _ in parts]),
+                   parts[-1][2], hits[0] if hits else None, iterations)
@@ -0,0 +1,343 @@
+"""
+Ratio engine, everything is done on log ratios and only converted to probabilities
+when a value is read
+
+    ratio_of_posterior = ratio_of_likelihood * ratio_of_prior
+
+becomes, in log space,
+
+    log_odds(posterior) = log_ratio(likelihood) + log_odds(prior)
+
+so an update is a single addition, nothing is clamped along the way and a long run
+of strong evidence never pins the belief at exactly 1.0 or 0.0. P(H_1) is recovered
+with the logistic function P(H_1) = ratio / (ratio + 1), and P(H_2) from the negated
+log odds rather than 1 - P(H_1) so it keeps its precision as well.
+"""
+
+import math
+
+from .evidence import normalize
+from .targets import clip, resolve
+
+
+def log_ratio(x_h_1, x_h_2):
+    """
+    log of [X_for_H_1 / X_for_H_2], X being a pair of likelihoods or a pair of priors,
+    nan when both are zero
+    """
+    if x_h_1 <= 0 and x_h_2 <= 0:
+        return math.nan
+    if x_h_1 <= 0:
+        return -math.inf
+    if x_h_2 <= 0:
+        return math.inf
+    return math.log(x_h_1) - math.log(x_h_2)
+
+
+def probability(log_odds):
+    """
+    P(H_1) for the given log odds, P(H_2) is probability(-log_odds)
+
+    nan log odds are where a +inf met a -inf (a likelihood of 0 against a belief
+    already at 1.0, or two zero likelihoods). BayesItem gets 0 / 0 there and sets
+    both posteriors to 0, and every later step keeps them there, so P(H_1) and
+    P(H_2) are both 0 and the nan carries on through later sums as that pair does
+    """
+    if math.isnan(log_odds):
+        return 0.0
+    if log_odds >= 0:
+        return 1.0 / (1.0 + math.exp(-log_odds))
+    e = math.exp(log_odds)
+    return e / (1.0 + e)
+
+
+class RatioItem:
+    """
+    One evidence step held as log odds, the probabilities are derived on read
+    """
+
+    def __init__(self, position, likelihood_h_1, likelihood_h_2, prior, posterior):
+        self.position = position
+        self.likelihood_h_1 = likelihood_h_1
+        self.likelihood_h_2 = likelihood_h_2
+        self.prior = prior
+        self.posterior = posterior
+
+    @property
+    def prior_h_1(self):
+        return probability(self.prior)
+
+    @property
+    def prior_h_2(self):
+        return probability(-self.prior)
+
+    @property
+    def posterior_h_1(self):
+        return probability(self.posterior)
+
+    @property
+    def posterior_h_2(self):
+        return probability(-self.posterior)
+
+    @property
+    def ratio(self):
+        """
+        ratio_of_posterior, as baseline_ratios.py reports it
+        """
+        if self.posterior > 709:
+            return math.inf
+        return math.exp(self.posterior)
+
+
+def bayes(likelihood_h_1, prior_h_1, likelihood_h_2, prior_h_2, iterations):
+    """
+    straight iterative bayes calculation, where priors become the previous posterior
+    """
+    return list(iter_bayes(likelihood_h_1, prior_h_1, likelihood_h_2, prior_h_2, iterations))
+
+
+def iter_bayes(likelihood_h_1, prior_h_1, likelihood_h_2, prior_h_2, iterations=None):
+    """
+    bayes one item at a time, without an end when iterations is None
+    """
+    step = log_ratio(likelihood_h_1, likelihood_h_2)
+    prior = log_ratio(prior_h_1, prior_h_2)
+    i = 0
+    while iterations is None or i < iterations:
+        posterior = prior + step
+        yield RatioItem(i, likelihood_h_1, likelihood_h_2, prior, posterior)
+        prior = posterior
+        i += 1
+
+
+def single_update(likelihood_h_1, prior_h_1, likelihood_h_2, prior_h_2, iterations, iteration_to_update, variance_h_1, variance_h_2):
+    """
+    one belief update, then return to normal likelihoods
+    """
+    updated_h_1 = normalize(likelihood_h_1 + variance_h_1)
+    updated_h_2 = normalize(likelihood_h_2 + variance_h_2)
+    likelihoods = []
+    for i in range(iterations):
+        if i == iteration_to_update:
+            likelihoods.append((updated_h_1, updated_h_2))
+        else:
+            likelihoods.append((likelihood_h_1, likelihood_h_2))
+    return chain(likelihoods, prior_h_1, prior_h_2)
+
+
+def chain(likelihoods, prior_h_1, prior_h_2):
+    """
+    bayes over a sequence of (likelihood_h_1, likelihood_h_2) pairs, the general form
+    of the per script iterative() functions
+    """
+    return list(iter_chain(likelihoods, prior_h_1, prior_h_2))
+
+
+def iter_chain(likelihoods, prior_h_1, prior_h_2):
+    """
+    chain one item at a time, the likelihoods can be any iterable, a generator
+    included, and nothing is kept between items
+    """
+    prior = log_ratio(prior_h_1, prior_h_2)
+    for i, (likelihood_h_1, likelihood_h_2) in enumerate(likelihoods):
+        posterior = prior + log_ratio(likelihood_h_1, likelihood_h_2)
+        yield RatioItem(i, likelihood_h_1, likelihood_h_2, prior, posterior)
+        prior = posterior
+
+
+def uniform_replay(prior_h_1, prior_h_2, likelihood_h_1, likelihood_h_2, count):
+    """
+    log odds after replaying count items from the prior, all reevaluated to the same
+    likelihood pair, which is ratio_of_prior * ratio_of_likelihood ** count
+    """
+    return log_ratio(prior_h_1, prior_h_2) + count * log_ratio(normalize(likelihood_h_1), normalize(likelihood_h_2))
+
+
+class Lookback:
+    """
+    Running state of a lookback, the log ratio of every step so far and their prefix
+    sums, so reevaluating k earlier positions costs O(k) rather than a full replay
+    """
+
+    def __init__(self, prior_h_1, prior_h_2):
+        self.start = log_ratio(prior_h_1, prior_h_2)
+        self.prior = self.start
+        self.steps = []
+        self.prefix = [0.0]
+        self.infinite = 0
+
+    def reevaluate(self, targets, likelihood_h_1, likelihood_h_2):
+        """
+        replay every earlier step from the first prior, the targets with the
+        reevaluation likelihoods, and make the result the prior of the next step,
+        a range of targets costs O(1) (O(k / stride) when strided)
+        """
+        reevaluated = log_ratio(normalize(likelihood_h_1), normalize(likelihood_h_2))
+        n = len(self.steps)
+        prior = self.start + self.prefix[n]
+        if isinstance(targets, range):
+            span = clip(targets, n)
+            if len(span) == n:
+                # every earlier step takes the same pair, the replay is the first
+                # prior times that pair's ratio to the power n
+                prior = self.start + n * reevaluated
+            elif self.infinite:
+                prior = self._replay(span, reevaluated)
+            elif len(span) and span.step == 1:
+                prior += len(span) * reevaluated - (self.prefix[span.stop] - self.prefix[span.start])
+            elif len(span):
+                prior += len(span) * reevaluated - sum(self.steps[span.start:span.stop:span.step])
+        elif self.infinite:
+            prior = self._replay(set(targets), reevaluated)
+        else:
+            for position in set(targets):
+                if 0 <= position < n:
+                    prior += reevaluated - self.steps[position]
+        self.prior = prior
+        return prior
+
+    def _replay(self, targets, reevaluated):
+        # once a likelihood of 0 or 1 has made a step infinite the prefix sums hold
+        # inf from there on, taking a step back out of them would be inf - inf, so
+        # the steps are summed again with the targets swapped
+        prior = self.start
+        for position, step in enumerate(self.steps):
+            prior += reevaluated if position in targets else step
+        return prior
+
+    def copy(self):
+        """
+        an independent state at the same step, for variants that branch here
+        """
+        state = Lookback.__new__(Lookback)
+        state.start = self.start
+        state.prior = self.prior
+        state.steps = list(self.steps)
+        state.prefix = list(self.prefix)
+        state.infinite = self.infinite
+        return state
+
+    def step(self, likelihood_h_1, likelihood_h_2):
+        step = log_ratio(likelihood_h_1, likelihood_h_2)
+        prior = self.prior
+        self.prior = prior + step
+        self.steps.append(step)
+        self.prefix.append(self.prefix[-1] + step)
+        self.infinite += not math.isfinite(step)
+        return RatioItem(len(self.steps) - 1, likelihood_h_1, likelihood_h_2, prior, self.prior)
+
+
+class WindowedLookback:
+    """
+    Lookback for reevaluations that never reach back more than window steps. Steps
+    older than that are folded into a single cumulative prior, only the last window
+    log ratios and prefix sums are kept, in ring buffers, so memory is O(window)
+    however long the run
+    """
+
+    def __init__(self, prior_h_1, prior_h_2, window):
+        if window < 1:
+            raise ValueError("window must be at least 1, got {}".format(window))
+        self.window = window
+        self.start = log_ratio(prior_h_1, prior_h_2)
+        self.prior = self.start
+        self.steps = [0.0] * window
+        self.prefix = [0.0] * (window + 1)
+        self.length = 0
+        self.infinite = 0
+
+    def _prefix(self, position):
+        return self.prefix[position % (self.window + 1)]
+
+    @property
+    def first(self):
+        """
+        the oldest position still held
+        """
+        return max(self.length - self.window, 0)
+
+    @property
+    def folded(self):
+        """
+        the first prior with every step before the window applied to it
+        """
+        return self.start + self._prefix(self.first)
+
+    def reevaluate(self, targets, likelihood_h_1, likelihood_h_2):
+        """
+        as Lookback.reevaluate, targets older than the window raise ValueError
+        """
+        reevaluated = log_ratio(normalize(likelihood_h_1), normalize(likelihood_h_2))
+        n = self.length
+        if isinstance(targets, range):
+            targets = clip(targets, n)
+        else:
+            targets = sorted(position for position in set(targets) if 0 <= position < n)
+        if len(targets) and targets[0] < self.first:
+            raise ValueError("reevaluation of {} reaches past the window of {} steps".format(targets[0], self.window))
+
+        prior = self.start + self._prefix(n)
+        if isinstance(targets, range) and len(targets) == n:
+            prior = self.start + n * reevaluated
+        elif self.infinite:
+            # as Lookback._replay, from the folded prior over the window
+            prior = self.folded
+            chosen = set(targets)
+            for position in range(self.first, n):
+                prior += reevaluated if position in chosen else self.steps[position % self.window]
+        elif isinstance(targets, range) and len(targets) and targets.step == 1:
+            prior += len(targets) * reevaluated - (self._prefix(targets.stop) - self._prefix(targets.start))
+        else:
+            for position in targets:
+                prior += reevaluated - self.steps[position % self.window]
+        self.prior = prior
+        return prior
+
+    def step(self, likelihood_h_1, likelihood_h_2):
+        step = log_ratio(likelihood_h_1, likelihood_h_2)
+        prior = self.prior
+        self.prior = prior + step
+        self.steps[self.length % self.window] = step
+        self.prefix[(self.length + 1) % (self.window + 1)] = self._prefix(self.length) + step
+        self.length += 1
+        self.infinite += not math.isfinite(step)
+        return RatioItem(self.length - 1, likelihood_h_1, likelihood_h_2, prior, self.prior)
+
+
+def lookback(evidences, window=None):
+    """
+    For the reevaluation of previous evidence
+
+    A replay from the first prior with some earlier likelihoods swapped for the
+    reevaluation likelihoods is the first prior plus the prefix sum of the log
+    ratios, corrected on the swapped positions only. When no reevaluation reaches
+    back more than window steps the older ones are folded, see WindowedLookback.
+
+    Likelihoods of 0 and 1 saturate the belief as the reference engine does, and
+    a reevaluation can take the belief back from there:
+
+    >>> from momentum.evidence import Evidence
+    >>> items = lookback([Evidence(0, 1.0, 0.0, .5, .5, [], .5, .5),
+    ...                   Evidence(1, .6, .4, .5, .5, [0], .6, .4)])
+    >>> [round(item.posterior_h_1, 4) for item in items]
+    [1.0, 0.6923]
+    """
+    return list(iter_lookback(evidences, window))
+
+
+def iter_lookback(evidences, window=None):
+    """
+    lookback one item at a time, the evidences can be a generator. Only the log
+    ratio and prefix sum of each step are kept (for later reevaluations), not the
+    items themselves, and with a window only the last window steps are kept
+    """
+    state = None
+    for i, evidence in enumerate(evidences):
+        targets = resolve(evidence.prior_evidence_positions_to_be_updated, i)
+        if state is None and window is not None:
+            state = WindowedLookback(evidence.prior_h_1, evidence.prior_h_2, window)
+        elif state is None:
+            state = Lookback(evidence.prior_h_1, evidence.prior_h_2)
+        elif targets:
+            state.reevaluate(targets, evidence.reevaluation_likelihood_h_1, evidence.reevaluation_likelihood_h_2)
+        yield state.step(evidence.likelihood_h_1, evidence.likelihood_h_2)
@@ -0,0 +1,184 @@
+"""
+Reference engine, today's BayesItem arithmetic kept operation for operation
+
+Every curve in output/results.txt was produced by pairs of probabilities updated
+with BayesItem.calculate_posterior and clamped by normalize(), so this is the engine
+the fast ones are held to. Nothing here is reordered or simplified, the floats it
+gives are the floats the scripts give.
+
+Importing it runs nothing, the scripts, the CLI and worker processes all share this
+one copy. lookback() takes an optional momentum.debug.Trace for the scripts' debug
+dumps, without one it does no debug work at all.
+"""
+
+from .evidence import normalize
+from .targets import resolve
+
+
+class BayesItem:
+    """
+    The item we'll calculate on
+    """
+
+    def __init__(self, position, likelihood_h_1, prior_h_1, likelihood_h_2, prior_h_2):
+        self.position = position
+        self.likelihood_h_1 = likelihood_h_1
+        self.likelihood_h_2 = likelihood_h_2
+        self.prior_h_1 = prior_h_1
+        self.prior_h_2 = prior_h_2
+        self.posterior_h_1 = 0.0
+        self.posterior_h_2 = 0.0
+        self.calculate_posterior()
+
+    def calculate_posterior(self):
+        self.posterior_h_1, self.posterior_h_2 = posterior(self.likelihood_h_1, self.prior_h_1,
+                                                           self.likelihood_h_2, self.prior_h_2)
+
+
+def posterior(likelihood_h_1, prior_h_1, likelihood_h_2, prior_h_2):
+    """
+    BayesItem.calculate_posterior without the item, for replays
+    """
+    if(((likelihood_h_1 * prior_h_1) + (likelihood_h_2 * prior_h_2)) > 0):
+        posterior_h_1 = (likelihood_h_1 * prior_h_1) / ((likelihood_h_1 * prior_h_1) + (likelihood_h_2 * prior_h_2))
+    else:
+        posterior_h_1 = 0
+    if(((likelihood_h_2 * prior_h_2) + (likelihood_h_1 * prior_h_1)) > 0):
+        posterior_h_2 = (likelihood_h_2 * prior_h_2) / ((likelihood_h_2 * prior_h_2) + (likelihood_h_1 * prior_h_1))
+    else:
+        posterior_h_2 = 0
+    return normalize(posterior_h_1), normalize(posterior_h_2)
+
+
+def bayes(likelihood_h_1, prior_h_1, likelihood_h_2, prior_h_2, iterations):
+    """
+    straight iterative bayes calculation, where priors become the previous posterior
+    """
+    items = []
+    for i in range(iterations):
+        b = BayesItem(i, likelihood_h_1, prior_h_1, likelihood_h_2, prior_h_2)
+        items.append(b)
+        # priors for the next are this iterations posterior
+        prior_h_1 = b.posterior_h_1
+        prior_h_2 = b.posterior_h_2
+    return items
+
+
+def single_update(likelihood_h_1, prior_h_1, likelihood_h_2, prior_h_2, iterations, iteration_to_update, variance_h_1, variance_h_2):
+    """
+    one belief update, then return to normal likelihoods
+    """
+    likelihoods = []
+    for i in range(iterations):
+        if i == iteration_to_update:
+            # Change in belief changes the likelihood, not the prior or posterior (that would be "magic")
+            likelihoods.append((normalize(likelihood_h_1 + variance_h_1), normalize(likelihood_h_2 + variance_h_2)))
+        else:
+            likelihoods.append((likelihood_h_1, likelihood_h_2))
+    return chain(likelihoods, prior_h_1, prior_h_2)
+
+
+def iterative(likelihood_h_1, prior_h_1, likelihood_h_2, prior_h_2, iterations, iteration_to_update, likelihoods):
+    """
+    Continue to update in the same one fashion until convergence, from
+    iteration_to_update on the likelihoods of each step come from likelihoods.at(i),
+    a PiecewiseSchedule in the baseline scripts
+    """
+    pairs = []
+    for i in range(iterations):
+        if i >= iteration_to_update:
+            likelihood_h_1, likelihood_h_2 = likelihoods.at(i)
+        pairs.append((likelihood_h_1, likelihood_h_2))
+    return chain(pairs, prior_h_1, prior_h_2)
+
+
+def chain(likelihoods, prior_h_1, prior_h_2):
+    """
+    bayes over a sequence of (likelihood_h_1, likelihood_h_2) pairs
+    """
+    items = []
+    for i, (likelihood_h_1, likelihood_h_2) in enumerate(likelihoods):
+        b = BayesItem(i, likelihood_h_1, prior_h_1, likelihood_h_2, prior_h_2)
+        items.append(b)
+        prior_h_1 = b.posterior_h_1
+        prior_h_2 = b.posterior_h_2
+    return items
+
+
+class Replay:
+    """
+    The running state of lookback(), the items so far and the prior of the next
+    one. It has ratios.Lookback's reevaluate/step/copy, so variants.shared_lookback
+    can branch it where the columns of a scenario stop agreeing
+    """
+
+    def __init__(self, prior_h_1, prior_h_2):
+        self.items = []
+        self.prior_h_1 = prior_h_1
+        self.prior_h_2 = prior_h_2
+
+    def reevaluate(self, targets, likelihood_h_1, likelihood_h_2, trace=None):
+        """
+        replay every earlier item from the first prior, the targets with the
+        reevaluation likelihoods, and make the result the prior of the next step
+        """
+        i = len(self.items)
+        if not isinstance(targets, range):
+            targets = set(targets)
+        prior_h_1 = self.prior_h_1
+        prior_h_2 = self.prior_h_2
+        for update_count, item in enumerate(self.items):
+            item_likelihood_h_1 = item.likelihood_h_1
+            item_likelihood_h_2 = item.likelihood_h_2
+            if update_count == 0:
+                prior_h_1 = item.prior_h_1
+                prior_h_2 = item.prior_h_2
+            if update_count in targets:
+                item_likelihood_h_1 = normalize(likelihood_h_1)
+                item_likelihood_h_2 = normalize(likelihood_h_2)
+            posterior_h_1, posterior_h_2 = posterior(item_likelihood_h_1, prior_h_1, item_likelihood_h_2, prior_h_2)
+            if trace is not None:
+                trace.replay(i, update_count, item_likelihood_h_1, prior_h_1, posterior_h_1, prior_h_2, posterior_h_2)
+            prior_h_1 = posterior_h_1
+            prior_h_2 = posterior_h_2
+        self.prior_h_1 = prior_h_1
+        self.prior_h_2 = prior_h_2
+
+    def copy(self):
+        """
+        an independent state at the same step, the items themselves are shared
+        """
+        state = Replay(self.prior_h_1, self.prior_h_2)
+        state.items = list(self.items)
+        return state
+
+    def step(self, likelihood_h_1, likelihood_h_2):
+        b = BayesItem(len(self.items), likelihood_h_1, self.prior_h_1, likelihood_h_2, self.prior_h_2)
+        self.items.append(b)
+        self.prior_h_1 = b.posterior_h_1
+        self.prior_h_2 = b.posterior_h_2
+        return b
+
+
+def lookback(evidences, trace=None):
+    """
+    For the reevaluation of previous evidence, every earlier item is replayed from
+    the first prior as prior_n_e.py does it
+    """
+    state = None
+    for i, evidence in enumerate(evidences):
+        traced = trace is not None and trace.wants(i)
+        if traced:
+            trace.evidence(evidence)
+
+        targets = resolve(evidence.prior_evidence_positions_to_be_updated, i)
+        if state is None:
+            state = Replay(evidence.prior_h_1, evidence.prior_h_2)
+        elif targets:
+            state.reevaluate(targets, evidence.reevaluation_likelihood_h_1, evidence.reevaluation_likelihood_h_2,
+                             trace if traced else None)
+
+        b = state.step(evidence.likelihood_h_1, evidence.likelihood_h_2)
+        if traced:
+            trace.step(b)
+    return state.items if state is not None else []
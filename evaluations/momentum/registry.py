@@ -0,0 +1,85 @@
+"""
+Every experiment by name, and by its ID in the thesis (see the README mappings)
+
+An experiment is either a scenario file shipped in momentum/scenarios, or one of the
+scripts next to the package that is not a scenario yet (the random ones). Scripts
+are only there when running from the source tree. A script's main(banner=False)
+runs it without the banner and returns the results file it wrote (None when it only
+prints), its RUNS says how many times over when the experiment is more than one run.
+Where the package can run a script's experiment itself, from a function of
+momentum.sweep, that function stands in for the script when it is not there.
+"""
+
+import os
+
+SCENARIOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenarios")
+SCRIPTS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# experiments that are not scenarios, the stuxnet and two_vars ones draw random
+# evidence, run as their script
+SCRIPT_EXPERIMENTS = (
+    "baseline_ratios",
+    "baseline_two_vars",
+    "baseline_up_and_down",
+    "baseline_up_and_down_reeval",
+    "simple_calc",
+    "stuxnet",
+    "stuxnet_reevaluation",
+    "stuxnet_reevaluation_sere",
+)
+
+# script experiments momentum.sweep can also run, name -> the function giving its
+# results.txt columns, for an installed package that has no scripts
+KERNEL_EXPERIMENTS = {
+    "baseline_two_vars": "two_vars",
+}
+
+# thesis figure -> experiment
+ALIASES = {
+    "3.1g": "baseline_two_vars",
+}
+
+
+def scenarios():
+    """
+    scenario name -> path of its file
+    """
+    return {name[:-len(".json")]: os.path.join(SCENARIOS, name)
+            for name in sorted(os.listdir(SCENARIOS)) if name.endswith(".json")}
+
+
+def scripts():
+    """
+    script name -> path, for the experiments that are still scripts
+    """
+    return {name: os.path.join(SCRIPTS, name + ".py") for name in SCRIPT_EXPERIMENTS
+            if os.path.isfile(os.path.join(SCRIPTS, name + ".py"))}
+
+
+def kernels():
+    """
+    script name -> momentum.sweep function, for the kernel experiments whose script
+    is not there
+    """
+    found = scripts()
+    return {name: function for name, function in KERNEL_EXPERIMENTS.items() if name not in found}
+
+
+def find(name):
+    """
+    ("scenario", path), ("script", path) or ("kernel", function) for a name, an ID or
+    a scenario file
+    """
+    if name.endswith(".json") and os.path.isfile(name):
+        return "scenario", name
+    name = ALIASES.get(name, name)
+    found = scenarios()
+    if name in found:
+        return "scenario", found[name]
+    found = scripts()
+    if name in found:
+        return "script", found[name]
+    found = kernels()
+    if name in found:
+        return "kernel", found[name]
+    raise KeyError("no experiment called {}".format(name))
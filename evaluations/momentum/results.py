@@ -0,0 +1,108 @@
+"""
+Compact run results, one contiguous array per field instead of a list of BayesItem
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+ResultItem = namedtuple("ResultItem", ["position", "likelihood_h_1", "likelihood_h_2",
+                                       "prior_h_1", "prior_h_2", "posterior_h_1", "posterior_h_2"])
+
+
+class Results:
+    """
+    Struct of arrays for a run, results[i] still reads like a BayesItem
+
+    The h_2 side is not stored, prior_h_2 and posterior_h_2 are 1 - the h_1 side.
+    """
+
+    def __init__(self, likelihood_h_1, likelihood_h_2, prior_h_1, posterior_h_1, position=None):
+        self.posterior_h_1 = np.ascontiguousarray(posterior_h_1, dtype=np.float64)
+        n = len(self.posterior_h_1)
+        self.likelihood_h_1 = np.ascontiguousarray(np.broadcast_to(likelihood_h_1, (n,)), dtype=np.float64)
+        self.likelihood_h_2 = np.ascontiguousarray(np.broadcast_to(likelihood_h_2, (n,)), dtype=np.float64)
+        self.prior_h_1 = np.ascontiguousarray(prior_h_1, dtype=np.float64)
+        if position is None:
+            position = np.arange(n)
+        self.position = np.ascontiguousarray(position, dtype=np.int64)
+
+    @classmethod
+    def from_items(cls, items):
+        """
+        pack a list of BayesItem (or anything with the same attributes)
+        """
+        return cls([item.likelihood_h_1 for item in items],
+                   [item.likelihood_h_2 for item in items],
+                   [item.prior_h_1 for item in items],
+                   [item.posterior_h_1 for item in items],
+                   [item.position for item in items])
+
+    @property
+    def prior_h_2(self):
+        return 1 - self.prior_h_1
+
+    @property
+    def posterior_h_2(self):
+        return 1 - self.posterior_h_1
+
+    @property
+    def nbytes(self):
+        return (self.position.nbytes + self.likelihood_h_1.nbytes + self.likelihood_h_2.nbytes +
+                self.prior_h_1.nbytes + self.posterior_h_1.nbytes)
+
+    def __len__(self):
+        return len(self.posterior_h_1)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return Results(self.likelihood_h_1[i], self.likelihood_h_2[i], self.prior_h_1[i],
+                           self.posterior_h_1[i], self.position[i])
+        prior_h_1 = float(self.prior_h_1[i])
+        posterior_h_1 = float(self.posterior_h_1[i])
+        return ResultItem(int(self.position[i]), float(self.likelihood_h_1[i]), float(self.likelihood_h_2[i]),
+                          prior_h_1, 1 - prior_h_1, posterior_h_1, 1 - posterior_h_1)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class Batch:
+    """
+    Several runs of the same length evaluated together, each field is a
+    (columns x steps) matrix and batch[c] is the Results for column c
+    """
+
+    def __init__(self, likelihood_h_1, likelihood_h_2, prior_h_1, posterior_h_1):
+        self.posterior_h_1 = np.ascontiguousarray(posterior_h_1, dtype=np.float64)
+        shape = self.posterior_h_1.shape
+        self.likelihood_h_1 = np.ascontiguousarray(np.broadcast_to(likelihood_h_1, shape), dtype=np.float64)
+        self.likelihood_h_2 = np.ascontiguousarray(np.broadcast_to(likelihood_h_2, shape), dtype=np.float64)
+        self.prior_h_1 = np.ascontiguousarray(prior_h_1, dtype=np.float64)
+
+    @property
+    def prior_h_2(self):
+        return 1 - self.prior_h_1
+
+    @property
+    def posterior_h_2(self):
+        return 1 - self.posterior_h_1
+
+    @property
+    def columns(self):
+        return self.posterior_h_1.shape[0]
+
+    @property
+    def steps(self):
+        return self.posterior_h_1.shape[1]
+
+    def __len__(self):
+        return self.columns
+
+    def __getitem__(self, c):
+        return Results(self.likelihood_h_1[c], self.likelihood_h_2[c], self.prior_h_1[c], self.posterior_h_1[c])
+
+    def __iter__(self):
+        for c in range(self.columns):
+            yield self[c]
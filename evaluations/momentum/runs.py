@@ -0,0 +1,147 @@
+"""
+Run length encoded evidence streams
+
+The likelihood schedules of the baseline scripts are a handful of long runs of the
+same pair (.51/.49 up to 499, then .49/.51, .48/.52 and .51/.49 again). A run of
+length k of one pair multiplies ratio_of_prior by ratio_of_likelihood ** k, which in
+log space is
+
+    log_odds(after run) = log_odds(before run) + k * log_ratio(likelihood)
+
+so a stream is advanced one run at a time and the cost of any horizon, 10^9 steps
+included, is the number of runs rather than the number of steps.
+"""
+
+from bisect import bisect_right
+
+from .ratios import log_ratio, probability
+
+
+class Run:
+    """
+    length consecutive pieces of evidence with the same likelihood pair
+    """
+
+    def __init__(self, likelihood_h_1, likelihood_h_2, length):
+        self.likelihood_h_1 = likelihood_h_1
+        self.likelihood_h_2 = likelihood_h_2
+        self.length = length
+
+    @property
+    def log_ratio(self):
+        return log_ratio(self.likelihood_h_1, self.likelihood_h_2)
+
+    def advance(self, log_odds, count=None):
+        """
+        log odds after count (by default all) of the run's steps, in one step
+        """
+        count = self.length if count is None else count
+        if count == 0:
+            return log_odds
+        return log_odds + count * self.log_ratio
+
+    def __repr__(self):
+        return "Run({}, {}, {})".format(self.likelihood_h_1, self.likelihood_h_2, self.length)
+
+
+class RunStream:
+    """
+    An evidence stream as runs, with the position each run starts at and the log
+    odds before it, so the belief at any step is a bisection and one advance
+    """
+
+    def __init__(self, prior_h_1=.5, prior_h_2=.5, runs=()):
+        self.start = log_ratio(prior_h_1, prior_h_2)
+        self.runs = []
+        self.starts = []
+        self.priors = []
+        self.length = 0
+        self.final = self.start
+        for run in runs:
+            self.append(run.likelihood_h_1, run.likelihood_h_2, run.length)
+
+    @classmethod
+    def from_likelihoods(cls, likelihoods, prior_h_1=.5, prior_h_2=.5):
+        """
+        encode a sequence of (likelihood_h_1, likelihood_h_2) pairs
+        """
+        stream = cls(prior_h_1, prior_h_2)
+        for likelihood_h_1, likelihood_h_2 in likelihoods:
+            stream.append(likelihood_h_1, likelihood_h_2)
+        return stream
+
+    @classmethod
+    def from_boundaries(cls, boundaries, likelihoods, iterations, prior_h_1=.5, prior_h_2=.5):
+        """
+        the scripts' if(i > 499) ladders, likelihoods[k] applies from boundaries[k]
+        (the first boundary being 0) up to the next boundary, the last up to iterations
+        """
+        stream = cls(prior_h_1, prior_h_2)
+        stops = list(boundaries[1:]) + [iterations]
+        for start, stop, (likelihood_h_1, likelihood_h_2) in zip(boundaries, stops, likelihoods):
+            stream.append(likelihood_h_1, likelihood_h_2, min(stop, iterations) - start)
+        return stream
+
+    def append(self, likelihood_h_1, likelihood_h_2, length=1):
+        """
+        add length steps of the pair, extending the last run when it is the same pair
+        """
+        if length <= 0:
+            return
+        if self.runs and (self.runs[-1].likelihood_h_1, self.runs[-1].likelihood_h_2) == (likelihood_h_1, likelihood_h_2):
+            self.runs[-1].length += length
+        else:
+            self.runs.append(Run(likelihood_h_1, likelihood_h_2, length))
+            self.starts.append(self.length)
+            self.priors.append(self.final)
+        self.length += length
+        self.final = self.runs[-1].advance(self.priors[-1])
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        """
+        the (likelihood_h_1, likelihood_h_2) of every step, for short streams only
+        """
+        for run in self.runs:
+            for _ in range(run.length):
+                yield run.likelihood_h_1, run.likelihood_h_2
+
+    def log_odds(self, position):
+        """
+        posterior log odds after the evidence at position
+        """
+        if not 0 <= position < self.length:
+            raise IndexError("no evidence at position {}".format(position))
+        k = bisect_right(self.starts, position) - 1
+        return self.runs[k].advance(self.priors[k], position - self.starts[k] + 1)
+
+    def belief(self, position):
+        """
+        posterior_h_1 after the evidence at position
+        """
+        return probability(self.log_odds(position))
+
+    def boundaries(self):
+        """
+        (last position, posterior log odds) at the end of every run
+        """
+        result = []
+        for run, start, prior in zip(self.runs, self.starts, self.priors):
+            result.append((start + run.length - 1, run.advance(prior)))
+        return result
+
+    def sample(self, every):
+        """
+        (position, posterior log odds) of every n-th step, walking the runs rather
+        than bisecting for each sample
+        """
+        result = []
+        position = 0
+        for run, start, prior in zip(self.runs, self.starts, self.priors):
+            stop = start + run.length
+            while position < stop:
+                result.append((position, run.advance(prior, position - start + 1)))
+                position += every
+        return result
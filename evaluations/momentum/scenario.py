@@ -0,0 +1,268 @@
+"""
+Declarative scenarios
+
+An experiment is a JSON file instead of a script. Each column of its results is a
+likelihood schedule, optional per position overrides and optional reevaluation
+rules, e.g. prior_n_e.py's [-26:-1] column is
+
+    {
+        "name": "last 25",
+        "likelihoods": {"after": [49, 99, 149], "values": [[0.51, 0.49], [0.49, 0.51], [0.48, 0.52], [0.51, 0.49]]},
+        "reevaluation": {"window": [-26, -1]}
+    }
+
+A schedule is a constant pair, {"after": thresholds, "values": pairs} (the scripts'
+if(i > 499) form) or {"breakpoints": positions, "values": pairs}. A reevaluation
+rule reevaluates, at each causing position i,
+
+    range(first, i + 1, stride)[start:stop:step]    ("window": [start, stop, step])
+
+(everything up to i when window is left out), restricted to the positions in "only"
+or without those in "except". It applies to causing positions from "from" up to
+"to" that are multiples of "every", the first rule that applies to a position wins,
+and the reevaluation likelihoods follow "likelihoods" unless given. An override
+sets the likelihoods of some positions and with "reevaluate": false stops them
+causing a reevaluation. The reevaluation likelihoods an evidence carries where no rule
+applies only show in the debug dumps, they follow the column's likelihoods unless
+the column gives "reevaluation_likelihoods" (a schedule) or an override does.
+
+compile() turns a scenario into packed arrays per column, run() evaluates a column
+on them with prefix sums, strided ones kept per residue, so no step of the run is
+a Python loop iteration. Column.evidences() gives the same column as Evidence for
+the reference and ratio engines.
+"""
+
+import json
+
+import numpy as np
+
+from . import engine, reference, variants
+from .evidence import Evidence
+from .schedule import PiecewiseSchedule
+from .vectorized import combine, log_ratio, results, split
+
+
+def schedule(spec):
+    """
+    a PiecewiseSchedule from its scenario form
+    """
+    if isinstance(spec, dict) and "after" in spec:
+        return PiecewiseSchedule.after(spec["after"], [tuple(pair) for pair in spec["values"]])
+    if isinstance(spec, dict):
+        return PiecewiseSchedule(spec.get("breakpoints", []), [tuple(pair) for pair in spec["values"]])
+    return PiecewiseSchedule([], [tuple(spec)])
+
+
+class Rule:
+    """
+    One reevaluation rule, packed
+    """
+
+    def __init__(self, spec, likelihoods, iterations):
+        self.start, self.stop, self.step = (list(spec.get("window", [])) + [None, None, None])[:3]
+        self.first = spec.get("first", 0)
+        self.stride = spec.get("stride", 1)
+        if (self.step is not None and self.step < 1) or self.stride < 1:
+            raise ValueError("reevaluation windows must step forward, got {} and {}".format(self.stride, self.step))
+        self.likelihoods = schedule(spec["likelihoods"]) if "likelihoods" in spec else likelihoods
+        self.reevaluation_h_1, self.reevaluation_h_2 = self.likelihoods.likelihoods(iterations)
+
+        self.keep = None
+        if "only" in spec:
+            self.keep = np.zeros(iterations, dtype=bool)
+            self.keep[[p for p in spec["only"] if 0 <= p < iterations]] = True
+        elif "except" in spec:
+            self.keep = np.ones(iterations, dtype=bool)
+            self.keep[[p for p in spec["except"] if 0 <= p < iterations]] = False
+
+        positions = np.arange(iterations)
+        self.applies = (positions >= spec.get("from", 0)) & (positions % spec.get("every", 1) == 0)
+        if "to" in spec:
+            self.applies &= positions < spec["to"]
+
+    def targets(self, position):
+        """
+        the targets of the evidence at position, as the scripts would list them
+        """
+        targets = range(self.first, position + 1, self.stride)[self.start:self.stop:self.step]
+        if self.keep is None:
+            return targets
+        return [x for x in targets if self.keep[x]]
+
+    def bounds(self, iterations):
+        """
+        first target, end of the targets and stride at every position, numpy slice
+        arithmetic over range(first, i + 1, stride)[start:stop:step]
+        """
+        positions = np.arange(iterations)
+        length = np.maximum(-(-(positions + 1 - self.first) // self.stride), 0)
+
+        def index(value, default):
+            if value is None:
+                return default
+            if value < 0:
+                return np.maximum(length + value, 0)
+            return np.minimum(value, length)
+
+        start = index(self.start, np.zeros_like(length))
+        stop = np.maximum(index(self.stop, length), start)
+        return self.first + start * self.stride, self.first + stop * self.stride, self.stride * (self.step or 1)
+
+
+class Column:
+    """
+    One results column of a compiled scenario, every field a packed array
+    """
+
+    def __init__(self, spec, iterations, prior_h_1, prior_h_2):
+        self.name = spec.get("name", "")
+        self.iterations = iterations
+        self.prior_h_1 = prior_h_1
+        self.prior_h_2 = prior_h_2
+        likelihoods = schedule(spec["likelihoods"])
+        self.likelihood_h_1, self.likelihood_h_2 = likelihoods.likelihoods(iterations)
+
+        rules = spec.get("reevaluation", [])
+        self.rules = [Rule(rule, likelihoods, iterations) for rule in (rules if isinstance(rules, list) else [rules])]
+
+        # which rule each causing position follows, -1 for none
+        self.rule = np.full(iterations, -1, dtype=np.int64)
+        for k in reversed(range(len(self.rules))):
+            self.rule[self.rules[k].applies] = k
+
+        for override in spec.get("overrides", []):
+            positions = [p for p in override["positions"] if 0 <= p < iterations]
+            if "likelihoods" in override:
+                self.likelihood_h_1[positions], self.likelihood_h_2[positions] = override["likelihoods"]
+            if not override.get("reevaluate", True):
+                self.rule[positions] = -1
+
+        if "reevaluation_likelihoods" in spec:
+            self.reevaluation_h_1, self.reevaluation_h_2 = schedule(spec["reevaluation_likelihoods"]).likelihoods(iterations)
+        else:
+            self.reevaluation_h_1 = self.likelihood_h_1.copy()
+            self.reevaluation_h_2 = self.likelihood_h_2.copy()
+        for override in spec.get("overrides", []):
+            if "reevaluation_likelihoods" in override:
+                positions = [p for p in override["positions"] if 0 <= p < iterations]
+                self.reevaluation_h_1[positions], self.reevaluation_h_2[positions] = override["reevaluation_likelihoods"]
+        for k, rule in enumerate(self.rules):
+            hit = self.rule == k
+            self.reevaluation_h_1[hit] = rule.reevaluation_h_1[hit]
+            self.reevaluation_h_2[hit] = rule.reevaluation_h_2[hit]
+
+    def evidences(self):
+        """
+        the column as a list of Evidence, for the engines that take one
+        """
+        evidences = []
+        for i in range(self.iterations):
+            k = self.rule[i]
+            evidences.append(Evidence(i, float(self.likelihood_h_1[i]), float(self.likelihood_h_2[i]),
+                                      self.prior_h_1, self.prior_h_2,
+                                      self.rules[k].targets(i) if k >= 0 else [],
+                                      float(self.reevaluation_h_1[i]), float(self.reevaluation_h_2[i])))
+        return evidences
+
+    def run(self):
+        """
+        the column's lookback from its packed arrays
+
+        A reevaluating position's prior is the first prior plus the prefix sum of the
+        log ratios, corrected on its targets by count * reevaluated - sum of their
+        ratios. Every other position carries on from the last one that reevaluated.
+        """
+        n = self.iterations
+        # the log ratios as their finite part and +-inf counts, so that steps with a
+        # likelihood of 0 or 1 come back out of the prefix sums exactly
+        parts = split(log_ratio(self.likelihood_h_1, self.likelihood_h_2))
+        prefix = np.zeros((3, n + 1))
+        np.cumsum(parts, axis=1, out=prefix[:, 1:])
+        start = float(log_ratio(self.prior_h_1, self.prior_h_2))
+        positions = np.arange(n)
+
+        priors = np.full(n, start)
+        reevaluates = np.zeros(n, dtype=bool)
+        for k, rule in enumerate(self.rules):
+            hit = self.rule == k
+            first, stop, stride = rule.bounds(n)
+            keep = np.ones(n) if rule.keep is None else rule.keep.astype(np.float64)
+
+            # any target at all, the causing position included, decides whether the
+            # replay happens, only the earlier ones are corrected
+            count = _strided(keep, first, stop, stride)
+            earlier = np.minimum(stop, positions)
+            corrected = _strided(keep, first, earlier, stride)
+
+            reevaluated = split(log_ratio(np.clip(rule.reevaluation_h_1, 0, 1), np.clip(rule.reevaluation_h_2, 0, 1)))
+            removed = [_strided(keep * part, first, earlier, stride) for part in parts]
+            up, down = (prefix[j, :n] + corrected * reevaluated[j] - removed[j] for j in (1, 2))
+            prior = combine(start + prefix[0, :n] + corrected * reevaluated[0] - removed[0], up, down)
+            hit &= (count > 0) & (positions > 0)
+            priors[hit] = prior[hit]
+            reevaluates |= hit
+
+        # the last reevaluating position at or before each position, 0 for none
+        last = np.maximum.accumulate(np.where(reevaluates, positions, 0))
+        curve = combine(priors[last] + prefix[0, 1:] - prefix[0, last], prefix[1, 1:] - prefix[1, last],
+                        prefix[2, 1:] - prefix[2, last])
+        return results(self.likelihood_h_1, self.likelihood_h_2, start, curve)
+
+
+def _strided(values, first, stop, stride):
+    """
+    sum of values[first:stop:stride] at every position, from per residue prefix sums
+    """
+    n = len(values)
+    width = -(-n // stride) * stride
+    padded = np.zeros(width)
+    padded[:n] = values
+    # cumulative[p] is the sum of values[p], values[p - stride], ... down to the residue
+    cumulative = np.cumsum(padded.reshape(-1, stride), axis=0).reshape(-1)
+
+    terms = np.maximum(-(-(stop - first) // stride), 0)
+    last = first + (terms - 1) * stride
+    before = first - stride
+    total = np.where(terms > 0, cumulative[np.clip(last, 0, width - 1)], 0.0)
+    return total - np.where((terms > 0) & (before >= 0), cumulative[np.clip(before, 0, width - 1)], 0.0)
+
+
+class Scenario:
+    """
+    A compiled scenario, its columns in results order
+    """
+
+    def __init__(self, spec):
+        self.name = spec.get("name", "")
+        self.iterations = spec["iterations"]
+        prior_h_1, prior_h_2 = spec.get("prior", [.5, .5])
+        self.cell = spec.get("cell", "{:5f}")
+        self.columns = [Column(column, self.iterations, prior_h_1, prior_h_2) for column in spec["columns"]]
+
+    def run(self, mode="fast"):
+        """
+        every column, from the packed arrays (fast) or through the BayesItem engine
+        (reference), which is what output/results.txt holds where beliefs saturate
+        """
+        if mode == "fast":
+            return [column.run() for column in self.columns]
+        if mode == "reference":
+            # columns that share their evidence up to some step are replayed together
+            # up to there
+            return variants.shared_lookback([column.evidences() for column in self.columns], reference.Replay)
+        raise ValueError("unknown mode {}, expected one of {}".format(mode, ", ".join(engine.MODES)))
+
+
+def compile(spec):
+    """
+    a Scenario from its dict form
+    """
+    return Scenario(spec)
+
+
+def load(path):
+    """
+    a Scenario from a JSON file
+    """
+    with open(path) as f:
+        return compile(json.load(f))
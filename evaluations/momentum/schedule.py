@@ -0,0 +1,73 @@
+"""
+Piecewise likelihood schedules
+
+The baseline scripts pick each step's likelihoods with has_processed cascades on
+thresholds (i > 1499, i > 999, i > 499), copied again into the code that builds
+their reevaluations. A PiecewiseSchedule holds the breakpoints and the pair for
+every piece once: a single step is a bisection, a whole range of steps is one
+searchsorted over the breakpoints and a gather, so no per step branching is left.
+"""
+
+from bisect import bisect_right
+
+from .runs import RunStream
+
+
+class PiecewiseSchedule:
+    """
+    values[0] up to breakpoints[0], then values[k] from breakpoints[k - 1] up to
+    breakpoints[k], the last value from the last breakpoint on
+    """
+
+    def __init__(self, breakpoints, values):
+        if len(values) != len(breakpoints) + 1:
+            raise ValueError("{} breakpoints need {} values, got {}".format(len(breakpoints), len(breakpoints) + 1, len(values)))
+        if any(a >= b for a, b in zip(breakpoints, breakpoints[1:])):
+            raise ValueError("breakpoints must be increasing: {}".format(breakpoints))
+        self.breakpoints = list(breakpoints)
+        self.values = list(values)
+
+    @classmethod
+    def after(cls, thresholds, values):
+        """
+        the scripts' form, values[k] applies where i > thresholds[k - 1]
+        """
+        return cls([threshold + 1 for threshold in thresholds], values)
+
+    def with_values(self, values):
+        """
+        the same pieces with other values, e.g. the reevaluation likelihoods
+        """
+        return PiecewiseSchedule(self.breakpoints, values)
+
+    def piece(self, position):
+        return bisect_right(self.breakpoints, position)
+
+    def at(self, position):
+        return self.values[self.piece(position)]
+
+    def likelihoods(self, start, stop=None):
+        """
+        (likelihoods_h_1, likelihoods_h_2) arrays for positions start..stop-1
+        """
+        import numpy as np
+
+        if stop is None:
+            start, stop = 0, start
+        pieces = np.searchsorted(np.asarray(self.breakpoints, dtype=np.int64), np.arange(start, stop), side="right")
+        values = np.asarray(self.values, dtype=np.float64)
+        return values[pieces, 0], values[pieces, 1]
+
+    def runs(self, iterations, prior_h_1=.5, prior_h_2=.5):
+        """
+        the first iterations steps as a RunStream, one run per piece
+        """
+        stream = RunStream(prior_h_1, prior_h_2)
+        starts = [0] + self.breakpoints
+        stops = self.breakpoints + [iterations]
+        for start, stop, (likelihood_h_1, likelihood_h_2) in zip(starts, stops, self.values):
+            stream.append(likelihood_h_1, likelihood_h_2, min(stop, iterations) - start)
+        return stream
+
+    def __repr__(self):
+        return "PiecewiseSchedule({}, {})".format(self.breakpoints, self.values)
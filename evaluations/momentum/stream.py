@@ -0,0 +1,44 @@
+"""
+Consumers for the iter_* generators
+
+A run can be consumed while it is produced: written straight to a results file,
+thinned to every n-th item, or watched along the way, without ever holding the
+list of items. Nothing here keeps more than the current item of each column.
+"""
+
+from itertools import islice
+
+
+def every(items, n):
+    """
+    every n-th item of a stream, starting with the first
+    """
+    return islice(items, 0, None, n)
+
+
+def watch(items, callback, interval=1):
+    """
+    pass the stream through, calling callback(item) on every interval-th item, for
+    progress reports and live monitors
+    """
+    for i, item in enumerate(items):
+        if i % interval == 0:
+            callback(item)
+        yield item
+
+
+def write_results(out, *columns, cell="{:5f}"):
+    """
+    write the columns side by side as output/results.txt lays them out, one line
+    per position, and stop with the shortest column. out is a path or an open file,
+    the number of lines written is returned
+    """
+    if isinstance(out, str):
+        with open(out, "w") as f:
+            return write_results(f, *columns, cell=cell)
+
+    count = 0
+    for i, row in enumerate(zip(*columns)):
+        out.write("{0:03d}".format(i) + "," + ",".join(cell.format(item.posterior_h_1) for item in row) + "\n")
+        count += 1
+    return count
@@ -0,0 +1,278 @@
+"""
+Parameter sweeps across a process pool
+
+A sweep runs one kernel at every point of a grid, e.g. baseline_two_vars.py's
+iterative(ITERATIONS, .49, 10) ... iterative(ITERATIONS, .01, 10) is
+
+    sweep(switching, {"likelihood": [.49, .4, .35, .3, .25, .2, .15, .1, .05, .01],
+                      "p": [10], "iterations": [200]})
+
+The points are handed to the workers chunksize at a time, so a task is a batch of
+points rather than one, and the posterior_h_1 curves come back as the rows of one
+matrix, in grid order. A kernel is any module level function taking the grid's
+names plus rng. Every point draws from its own generator, spawned from the sweep's
+seed by its index in the grid, so a seeded sweep gives the same matrix whatever the
+number of workers or the chunk size.
+
+The kernels here run in log space (momentum.vectorized), the reference engine is
+for reproducing output/results.txt, not for thousands of grid points.
+
+window_sweep() is windowed() over a whole grid of windows and strides without the
+pool: the forward pass and the prefix sums of the log ratios are computed once,
+the per stride sums once per stride, and every window of a stride is then one
+broadcast over (windows x positions).
+"""
+
+import inspect
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from .results import Batch
+from .scenario import Column, schedule
+from .vectorized import combine, log_ratio, probability, split
+
+# the likelihoods of prior_n_e.py's lookback columns
+PRIOR_N_E_LIKELIHOODS = {"after": [49, 99, 149], "values": [[.51, .49], [.49, .51], [.48, .52], [.51, .49]]}
+
+# the likelihoods of baseline_two_vars.py's switching columns
+TWO_VARS_LIKELIHOODS = (.49, .4, .35, .3, .25, .2, .15, .1, .05, .01)
+
+
+def switching(likelihood, p, iterations, rng, base=(.51, .49), prior_h_1=.5, prior_h_2=.5):
+    """
+    baseline_two_vars.py's iterative(): a step is (likelihood, 1 - likelihood) when a
+    draw of 1..100 comes out below p, base otherwise
+    """
+    likelihood_h_1, likelihood_h_2 = _switches(likelihood, p, iterations, rng, base)
+    return probability(log_ratio(prior_h_1, prior_h_2) + np.cumsum(log_ratio(likelihood_h_1, likelihood_h_2)))
+
+
+def _switches(likelihood, p, iterations, rng, base):
+    hit = rng.integers(1, 101, size=iterations) < p
+    return np.where(hit, likelihood, base[0]), np.where(hit, 1 - likelihood, base[1])
+
+
+def two_vars(seed=None, iterations=200, p=10, likelihoods=TWO_VARS_LIKELIHOODS, base=(.51, .49), prior_h_1=.5, prior_h_2=.5):
+    """
+    baseline_two_vars.py's experiment as a Batch in results.txt order, bayes on base
+    then a switching column for every likelihood, for when the script is not there
+    (registry.KERNEL_EXPERIMENTS)
+    """
+    rng = np.random.default_rng(seed)
+    # a p of 0 never switches, which is plain bayes on base
+    columns = [_switches(likelihood, chance, iterations, rng, base)
+               for likelihood, chance in [(base[0], 0)] + [(likelihood, p) for likelihood in likelihoods]]
+    likelihood_h_1 = np.array([column[0] for column in columns])
+    likelihood_h_2 = np.array([column[1] for column in columns])
+    start = log_ratio(prior_h_1, prior_h_2)
+    priors = start + np.cumsum(log_ratio(likelihood_h_1, likelihood_h_2), axis=1)
+    return Batch(likelihood_h_1, likelihood_h_2, probability(np.hstack([np.full((len(columns), 1), start), priors[:, :-1]])),
+                 probability(priors))
+
+
+def windowed(window, iterations, rng=None, stride=1, likelihoods=PRIOR_N_E_LIKELIHOODS, prior_h_1=.5, prior_h_2=.5):
+    """
+    prior_n_e.py's lookback for any window, every position reevaluates the window
+    pieces of evidence before it (evidence_to_reeval[-(window + 1):-1]), all of them
+    when window is None
+    """
+    if (window is not None and window < 0) or stride < 1:
+        raise ValueError("windowed needs a window of at least 0 and a stride of at least 1, got {} and {}".format(window, stride))
+    rule = {"stride": stride}
+    if window is not None:
+        rule["window"] = [-(window + 1), -1]
+    spec = {"likelihoods": likelihoods, "reevaluation": rule}
+    return Column(spec, iterations, prior_h_1, prior_h_2).run().posterior_h_1
+
+
+KERNELS = {
+    "switching": switching,
+    "windowed": windowed,
+}
+
+# the least value of the kernels' counting arguments, none of them can be negative
+# and a stride of 0 never moves
+LEAST = {
+    "iterations": 0,
+    "window": 0,
+    "stride": 1,
+}
+
+
+class Sweep:
+    """
+    The curves of a sweep, matrix[k] is the posterior_h_1 curve at points[k], shorter
+    curves (a grid over iterations) are padded with nan and lengths[k] says where
+    each ends
+    """
+
+    def __init__(self, names, points, matrix, lengths):
+        self.names = names
+        self.points = points
+        self.matrix = matrix
+        self.lengths = lengths
+
+    def row(self, **values):
+        """
+        the curve at the point with these values
+        """
+        for k, point in enumerate(self.points):
+            if all(point[name] == value for name, value in values.items()):
+                return self.matrix[k]
+        raise KeyError("no point {}".format(values))
+
+    def __len__(self):
+        return len(self.points)
+
+
+def check(kernel, grid):
+    """
+    ValueError unless the grid gives kernel every argument it needs (rng comes from
+    the sweep) and nothing it does not take, before any worker is started
+    """
+    parameters = inspect.signature(kernel).parameters
+    names = [name for name, parameter in parameters.items() if name != "rng" and parameter.kind != parameter.VAR_KEYWORD]
+    anything = len(names) < len(parameters) - ("rng" in parameters)
+    unknown = [name for name in grid if name == "rng" or (name not in names and not anything)]
+    if unknown:
+        raise ValueError("{} takes no {}, its arguments are {}".format(kernel.__name__, ", ".join(unknown), ", ".join(names)))
+    missing = [name for name in names if parameters[name].default is parameters[name].empty and name not in grid]
+    if missing:
+        raise ValueError("{} needs a value for {}".format(kernel.__name__, ", ".join(missing)))
+
+    # arguments like likelihoods or base take a schedule or a pair, never a number
+    for name, values in grid.items():
+        default = parameters[name].default if name in parameters else None
+        if isinstance(default, (tuple, list, dict)):
+            for value in values:
+                if isinstance(value, (int, float)):
+                    raise ValueError("{} of {} takes a {}, not {}".format(name, kernel.__name__, type(default).__name__, value))
+        for value in values:
+            if name in LEAST and value is not None and value < LEAST[name]:
+                raise ValueError("{} of {} must be at least {}, got {}".format(name, kernel.__name__, LEAST[name], value))
+
+
+def points(grid):
+    """
+    every combination of the grid's values as a dict, the last name varying fastest
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def _point(kernel, point, seed):
+    return np.asarray(kernel(rng=np.random.default_rng(seed), **point), dtype=np.float64)
+
+
+def sweep(kernel, grid, seed=None, workers=None, chunksize=None):
+    """
+    kernel at every point of grid (name -> values) as a Sweep, across worker
+    processes, chunksize defaults to four batches per worker
+    """
+    check(kernel, grid)
+    found = points(grid)
+    seeds = np.random.SeedSequence(seed).spawn(len(found))
+    workers = workers or os.cpu_count() or 1
+    chunksize = chunksize or max(1, len(found) // (4 * workers))
+
+    run = partial(_point, kernel)
+    if workers == 1:
+        curves = list(map(run, found, seeds))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            curves = list(pool.map(run, found, seeds, chunksize=chunksize))
+
+    lengths = np.array([len(curve) for curve in curves], dtype=np.int64)
+    matrix = np.full((len(found), int(lengths.max(initial=0))), np.nan)
+    for k, curve in enumerate(curves):
+        matrix[k, :len(curve)] = curve
+    return Sweep(list(grid), found, matrix, lengths)
+
+
+def window_sweep(grid, likelihoods=PRIOR_N_E_LIKELIHOODS, reevaluation_likelihoods=None, prior_h_1=.5, prior_h_2=.5):
+    """
+    windowed() at every point of a grid over window, stride and iterations as a
+    Sweep, the same rows as sweep(windowed, grid) in the same order
+
+    At causing position i the stride s evidence is range(0, i + 1, s), L = i // s + 1
+    positions, and the window keeps its entries first = max(L - window - 1, 0) up to
+    L - 1, all before i (a window of None keeps them all). The prior there is the
+    first prior plus the prefix sum of the log ratios, plus count * reevaluated minus
+    their log ratios, sums[L - 1] - sums[first] over the stride's sums. Every other
+    position carries on from the last one that reevaluated, as Column.run() does.
+    The grid must give window and iterations, it is checked as sweep() checks it.
+    """
+    check(windowed, grid)
+    if not set(grid) <= {"window", "stride", "iterations"}:
+        raise ValueError("window_sweep sweeps window, stride and iterations, not {}".format(
+            ", ".join(sorted(set(grid) - {"window", "stride", "iterations"}))))
+    found = points(grid)
+    n = max((point["iterations"] for point in found), default=0)
+    likelihood_h_1, likelihood_h_2 = schedule(likelihoods).likelihoods(n)
+    # finite parts and +-inf counts of the log ratios, as in Column.run()
+    parts = np.array(split(log_ratio(likelihood_h_1, likelihood_h_2)))
+    prefix = np.zeros((3, n + 1))
+    np.cumsum(parts, axis=1, out=prefix[:, 1:])
+    start = float(log_ratio(prior_h_1, prior_h_2))
+    if reevaluation_likelihoods is not None:
+        likelihood_h_1, likelihood_h_2 = schedule(reevaluation_likelihoods).likelihoods(n)
+    reevaluated = split(log_ratio(np.clip(likelihood_h_1, 0, 1), np.clip(likelihood_h_2, 0, 1)))
+    positions = np.arange(n)
+
+    windows = sorted({point["window"] for point in found}, key=lambda window: -1 if window is None else window)
+    everything = np.array([window is None for window in windows])
+    sizes = np.array([0 if window is None else window for window in windows])[:, None]
+    strides = sorted({point.get("stride", 1) for point in found})
+    rows = np.arange(len(windows))[:, None]
+    surfaces = {}
+    for stride in strides:
+        sums = np.zeros((3, -(-n // stride) + 1))
+        np.cumsum(parts[:, ::stride], axis=1, out=sums[:, 1:])
+        length = positions // stride + 1
+        first = np.maximum(length - sizes - 1, 0)
+        stop = np.repeat((length - 1)[None, :], len(windows), axis=0)
+        any_target = stop > first
+        # a window of None is all of range(0, i + 1, s), i included when s divides it,
+        # so any position replays and the ones before i are corrected
+        first[everything] = 0
+        stop[everything] = -(-positions // stride)
+        any_target[everything] = True
+
+        count = stop - first
+        removed = sums[:, stop] - sums[:, first]
+        up, down = (prefix[j, :n] + count * reevaluated[j] - removed[j] for j in (1, 2))
+        prior = combine(start + prefix[0, :n] + count * reevaluated[0] - removed[0], up, down)
+        hit = any_target & (positions > 0)
+        priors = np.where(hit, prior, start)
+
+        # the last reevaluating position at or before each position, 0 for none
+        last = np.maximum.accumulate(np.where(hit, positions, 0), axis=1)
+        surfaces[stride] = probability(combine(priors[rows, last] + prefix[0, 1:] - prefix[0, last],
+                                               prefix[1, 1:] - prefix[1, last], prefix[2, 1:] - prefix[2, last]))
+
+    lengths = np.array([point["iterations"] for point in found], dtype=np.int64)
+    matrix = np.full((len(found), n), np.nan)
+    for k, point in enumerate(found):
+        window = point["window"]
+        matrix[k, :lengths[k]] = surfaces[point.get("stride", 1)][windows.index(window), :lengths[k]]
+    return Sweep(list(grid), found, matrix, lengths)
+
+
+def write_matrix(out, result, cell="{:5f}"):
+    """
+    one line per point, its values then its curve, after a line of the names. out
+    is a path or an open file
+    """
+    if isinstance(out, str):
+        with open(out, "w") as f:
+            return write_matrix(f, result, cell=cell)
+
+    out.write(",".join(result.names) + "\n")
+    for point, curve, length in zip(result.points, result.matrix, result.lengths):
+        cells = [cell.format(x) for x in curve[:length]]
+        out.write(",".join([str(point[name]) for name in result.names] + cells) + "\n")
+    return len(result)
@@ -0,0 +1,93 @@
+"""
+Reevaluation target sets
+
+Targets can be given as compact descriptors instead of a list of positions: a range
+(start, stop, stride) of absolute positions, or a Window, a slice relative to the
+causing evidence such as evidence_to_reeval[-26:-1]. Both are O(1) in memory, the
+engines use them as they are and they are only expanded to lists on demand.
+
+Masks answer "is this position reevaluated" for every position at once, so a replay
+applies its targets in bulk rather than testing list membership once per replayed
+item.
+"""
+
+
+class Window:
+    """
+    evidence_to_reeval[start:stop:step] where evidence_to_reeval holds every position
+    from first up to and including the causing one, kept as the slice itself
+    """
+
+    def __init__(self, start=None, stop=None, step=None, first=0):
+        self.start = start
+        self.stop = stop
+        self.step = step
+        self.first = first
+
+    def at(self, position):
+        """
+        the targets of the evidence at position, as a range
+        """
+        return range(self.first, position + 1)[self.start:self.stop:self.step]
+
+    def __repr__(self):
+        return "Window({}, {}, {}, first={})".format(self.start, self.stop, self.step, self.first)
+
+
+def resolve(targets, position):
+    """
+    the targets of the evidence at position, Windows become ranges, anything else
+    is returned as it is
+    """
+    if isinstance(targets, Window):
+        return targets.at(position)
+    return targets
+
+
+def clip(span, length):
+    """
+    the part of a range inside 0..length-1, in increasing order and still a range
+    """
+    if span.step < 0:
+        span = span[::-1]
+    start = span.start
+    if start < 0:
+        start -= (start // span.step) * span.step
+    return range(start, max(start, min(span.stop, length)), span.step)
+
+
+def expand(targets):
+    """
+    the positions of any target set as a list, for writing out
+    """
+    if isinstance(targets, list):
+        return targets
+    return list(targets)
+
+
+def mask(positions, length):
+    """
+    boolean mask of the given positions (or of another mask), those outside
+    0..length-1 are dropped
+    """
+    import numpy as np
+
+    result = np.zeros(length, dtype=bool)
+    if isinstance(positions, np.ndarray) and positions.dtype == bool:
+        n = min(len(positions), length)
+        result[:n] = positions[:n]
+        return result
+    if isinstance(positions, range):
+        positions = clip(positions, length)
+        result[positions.start:positions.stop:positions.step] = True
+        return result
+    positions = np.fromiter(positions, dtype=np.int64)
+    result[positions[(positions >= 0) & (positions < length)]] = True
+    return result
+
+
+def expanded(evidence):
+    """
+    evidence.__dict__ with its targets expanded to a list, for the debug dumps
+    """
+    return dict(evidence.__dict__, prior_evidence_positions_to_be_updated=expand(evidence.prior_evidence_positions_to_be_updated))
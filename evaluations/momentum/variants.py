@@ -0,0 +1,95 @@
+"""
+Shared prefix evaluation across the variants of one scenario
+
+The columns of a figure (evidences2..evidences5 of chicken_little.py, say) are often
+the same evidence up to some step and only differ after it. Variants are evaluated
+as a group while their next pieces of evidence agree, and the group splits where
+they stop agreeing, each part carrying on from a copy of the state at that step,
+so every shared prefix is computed once however many variants share it.
+"""
+
+from .ratios import Lookback
+from .targets import resolve
+
+
+def key(evidence, position):
+    """
+    everything lookback reads from the evidence at position, two variants with equal
+    keys at every step up to position have the same items up to position
+    """
+    targets = resolve(evidence.prior_evidence_positions_to_be_updated, position)
+    if not isinstance(targets, range):
+        targets = frozenset(targets)
+    if not targets:
+        targets = None
+    return (evidence.likelihood_h_1, evidence.likelihood_h_2,
+            evidence.prior_h_1, evidence.prior_h_2, targets,
+            evidence.reevaluation_likelihood_h_1, evidence.reevaluation_likelihood_h_2)
+
+
+class _Traces:
+    """
+    the traces of a group's variants, each given the same replayed items
+    """
+
+    def __init__(self, traces):
+        self.traces = traces
+
+    def replay(self, *item):
+        for trace in self.traces:
+            trace.replay(*item)
+
+
+def shared_lookback(variants, start=Lookback, traces=None):
+    """
+    ratios.lookback of every variant, a list of item lists in the same order, with
+    the common prefixes evaluated once and their items shared between the variants.
+    start makes the state from the first priors, reference.Replay gives the
+    reference engine's items instead. traces, with reference.Replay, is a
+    momentum.debug.Trace or None per variant, each gets the lines
+    reference.lookback(evidences, trace) would have given it
+    """
+    variants = [list(evidences) for evidences in variants]
+    results = [None] * len(variants)
+    if traces is None:
+        traces = [None] * len(variants)
+
+    # (variants agreeing on evidence 0..position-1, next position, state, items)
+    groups = [(list(range(len(variants))), 0, None, [])]
+    while groups:
+        group, position, state, items = groups.pop()
+        while True:
+            ended = [k for k in group if len(variants[k]) == position]
+            for k in ended:
+                results[k] = list(items)
+            group = [k for k in group if len(variants[k]) > position]
+            if not group:
+                break
+
+            parts = {}
+            for k in group:
+                parts.setdefault(key(variants[k][position], position), []).append(k)
+            if len(parts) > 1:
+                # every part but the one continuing here starts from a copy
+                for part in list(parts.values())[1:]:
+                    groups.append((part, position, state.copy() if state else None, list(items)))
+                group = list(parts.values())[0]
+
+            evidence = variants[group[0]][position]
+            traced = [traces[k] for k in group if traces[k] is not None and traces[k].wants(position)]
+            for trace in traced:
+                trace.evidence(evidence)
+
+            targets = resolve(evidence.prior_evidence_positions_to_be_updated, position)
+            if state is None:
+                state = start(evidence.prior_h_1, evidence.prior_h_2)
+            elif targets and traced:
+                state.reevaluate(targets, evidence.reevaluation_likelihood_h_1, evidence.reevaluation_likelihood_h_2,
+                                 _Traces(traced))
+            elif targets:
+                state.reevaluate(targets, evidence.reevaluation_likelihood_h_1, evidence.reevaluation_likelihood_h_2)
+            items.append(state.step(evidence.likelihood_h_1, evidence.likelihood_h_2))
+            for trace in traced:
+                trace.step(items[-1])
+            position += 1
+    return results
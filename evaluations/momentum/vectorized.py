@@ -0,0 +1,183 @@
+"""
+NumPy versions of the ratio engine, a whole posterior curve per call
+
+A chain of bayes updates is a running sum of log likelihood ratios, so the curve
+is one cumulative sum over the ratios (or, for a constant pair, the ratio times the
+step count) added to the log odds of the prior.
+"""
+
+import numpy as np
+
+from . import targets
+from .evidence import normalize
+from .results import Batch, Results
+
+
+def log_ratio(x_h_1, x_h_2):
+    """
+    elementwise log of [X_for_H_1 / X_for_H_2], see ratios.log_ratio, nan where
+    both are zero
+    """
+    x_h_1 = np.asarray(x_h_1, dtype=np.float64)
+    x_h_2 = np.asarray(x_h_2, dtype=np.float64)
+    zero = (x_h_1 <= 0) & (x_h_2 <= 0)
+    with np.errstate(divide="ignore"):
+        ratio = np.log(np.clip(x_h_1, 0, None)) - np.log(np.clip(np.where(zero, 1.0, x_h_2), 0, None))
+    return np.where(zero, np.nan, ratio)
+
+
+def split(log_ratios):
+    """
+    log ratios as their finite part and their counts of +inf and -inf, sums and
+    differences of the three stay exact where those of the log ratios themselves
+    would give inf - inf. A nan (two zero likelihoods) counts as both
+    """
+    log_ratios = np.asarray(log_ratios, dtype=np.float64)
+    zero = np.isnan(log_ratios)
+    return (np.where(np.isfinite(log_ratios), log_ratios, 0.0),
+            ((log_ratios == np.inf) | zero).astype(np.float64),
+            ((log_ratios == -np.inf) | zero).astype(np.float64))
+
+
+def combine(finite, up, down):
+    """
+    the sum back from split() parts, the finite part may itself be infinite or nan
+    (a prior). nan where it holds both a +inf and a -inf, see probability()
+    """
+    finite = np.asarray(finite, dtype=np.float64)
+    up = (up > 0) | (finite == np.inf)
+    down = (down > 0) | (finite == -np.inf)
+    return np.where((up & down) | np.isnan(finite), np.nan, np.where(up, np.inf, np.where(down, -np.inf, finite)))
+
+
+def probability(log_odds):
+    """
+    elementwise P(H_1) for the given log odds, P(H_2) is probability(-log_odds),
+    0 for nan log odds, see ratios.probability
+    """
+    log_odds = np.asarray(log_odds, dtype=np.float64)
+    e = np.exp(-np.abs(log_odds))
+    return np.where(np.isnan(log_odds), 0.0, np.where(log_odds >= 0, 1.0 / (1.0 + e), e / (1.0 + e)))
+
+
+def log_odds(likelihood_h_1, prior_h_1, likelihood_h_2, prior_h_2, iterations=None):
+    """
+    posterior log odds after each step, likelihoods are either a constant pair
+    (iterations is then required) or two arrays of per step likelihoods
+    """
+    prior = float(log_ratio(prior_h_1, prior_h_2))
+    steps = log_ratio(likelihood_h_1, likelihood_h_2)
+    if steps.ndim == 0:
+        if iterations is None:
+            raise ValueError("iterations is required for a constant likelihood pair")
+        with np.errstate(invalid="ignore"):
+            return prior + float(steps) * np.arange(1, iterations + 1, dtype=np.float64)
+    if iterations is not None:
+        steps = steps[:iterations]
+    # +inf meeting -inf is the 0/0 pair, nan on purpose (see ratios.probability)
+    with np.errstate(invalid="ignore"):
+        return prior + np.cumsum(steps)
+
+
+def bayes(likelihood_h_1, prior_h_1, likelihood_h_2, prior_h_2, iterations=None):
+    """
+    straight iterative bayes calculation, where priors become the previous posterior
+    """
+    curve = log_odds(likelihood_h_1, prior_h_1, likelihood_h_2, prior_h_2, iterations)
+    n = len(curve)
+    if np.ndim(likelihood_h_1) > 0:
+        likelihood_h_1 = np.asarray(likelihood_h_1)[:n]
+        likelihood_h_2 = np.asarray(likelihood_h_2)[:n]
+    return results(likelihood_h_1, likelihood_h_2, log_ratio(prior_h_1, prior_h_2), curve)
+
+
+def scheduled(schedule, iterations, prior_h_1=.5, prior_h_2=.5):
+    """
+    bayes over the first iterations steps of a PiecewiseSchedule, its likelihood
+    arrays come from one lookup rather than a branch per step
+    """
+    likelihood_h_1, likelihood_h_2 = schedule.likelihoods(iterations)
+    return bayes(likelihood_h_1, prior_h_1, likelihood_h_2, prior_h_2)
+
+
+def results(likelihood_h_1, likelihood_h_2, prior, curve):
+    """
+    Results for a posterior log odds curve that started from the prior log odds
+    """
+    posterior_h_1 = probability(curve)
+    prior_h_1 = np.empty_like(posterior_h_1)
+    prior_h_1[:1] = probability(prior)
+    prior_h_1[1:] = posterior_h_1[:-1]
+    return Results(likelihood_h_1, likelihood_h_2, prior_h_1, posterior_h_1)
+
+
+def batch(likelihoods_h_1, likelihoods_h_2, prior_h_1=.5, prior_h_2=.5):
+    """
+    every column of a (columns x steps) likelihood matrix evolved at once, the priors
+    are either shared or one per column
+    """
+    likelihoods_h_1 = np.atleast_2d(np.asarray(likelihoods_h_1, dtype=np.float64))
+    likelihoods_h_2 = np.atleast_2d(np.asarray(likelihoods_h_2, dtype=np.float64))
+    prior = np.broadcast_to(log_ratio(prior_h_1, prior_h_2), (likelihoods_h_1.shape[0],))
+    with np.errstate(invalid="ignore"):
+        curve = prior[:, None] + np.cumsum(log_ratio(likelihoods_h_1, likelihoods_h_2), axis=1)
+    posterior_h_1 = probability(curve)
+    prior_h_1 = np.empty_like(posterior_h_1)
+    prior_h_1[:, :1] = probability(prior)[:, None]
+    prior_h_1[:, 1:] = posterior_h_1[:, :-1]
+    return Batch(likelihoods_h_1, likelihoods_h_2, prior_h_1, posterior_h_1)
+
+
+def _removed(parts, prefix, reevaluation, i):
+    """
+    how many of the positions before i the targets hold, and the sum of their split()
+    parts, from the prefix sums for a range (O(1), O(k / stride) strided) and by
+    index otherwise (O(k))
+    """
+    if isinstance(reevaluation, range):
+        span = targets.clip(reevaluation, i)
+        if not len(span):
+            return 0, np.zeros(3)
+        if span.step == 1:
+            return len(span), prefix[:, span.stop] - prefix[:, span.start]
+        return len(span), np.sum(parts[:, span.start:span.stop:span.step], axis=1)
+    positions = np.unique(np.fromiter(reevaluation, dtype=np.int64))
+    positions = positions[(positions >= 0) & (positions < i)]
+    return len(positions), np.sum(parts[:, positions], axis=1)
+
+
+def lookback(evidences):
+    """
+    For the reevaluation of previous evidence
+
+    Each reevaluation is the first prior plus the prefix sum of the log ratios,
+    corrected on its targets only, as ratios.Lookback does it.
+    """
+    evidences = list(evidences)
+    if not evidences:
+        raise ValueError("lookback needs at least one piece of evidence")
+    n = len(evidences)
+    likelihood_h_1 = np.array([e.likelihood_h_1 for e in evidences], dtype=np.float64)
+    likelihood_h_2 = np.array([e.likelihood_h_2 for e in evidences], dtype=np.float64)
+    steps = log_ratio(likelihood_h_1, likelihood_h_2)
+    parts = np.array(split(steps))
+    prefix = np.zeros((3, n + 1))
+    np.cumsum(parts, axis=1, out=prefix[:, 1:])
+
+    start = float(log_ratio(evidences[0].prior_h_1, evidences[0].prior_h_2))
+    curve = np.empty(n)
+    prior = start
+    for i, evidence in enumerate(evidences):
+        reevaluation = targets.resolve(evidence.prior_evidence_positions_to_be_updated, i)
+        if i and len(reevaluation):
+            count, removed = _removed(parts, prefix, reevaluation, i)
+            reevaluated = np.array(split(log_ratio(normalize(evidence.reevaluation_likelihood_h_1),
+                                                   normalize(evidence.reevaluation_likelihood_h_2))))
+            # finite part and +-inf counts of the replay, a removed infinite step
+            # only lowers a count
+            finite, up, down = prefix[:, i] + count * reevaluated - removed
+            prior = float(combine(start + finite, up, down))
+        curve[i] = prior + float(steps[i])
+        prior = float(curve[i])
+
+    return results(likelihood_h_1, likelihood_h_2, start, curve)
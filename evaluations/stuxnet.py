@@ -1,56 +1,22 @@
 #!/usr/bin/python3
 
-import os
-import shutil
-from decimal import *
-import random
-
 """
 Industrial control systems, computer software and certainly sophisticated malware are subject 
 to many different input values, and so we attempt to simulate two competing pieces of evidence 
 for the same hypothesis H_1, one of high probability and one of low.
 """
 
+import os
+import random
+import shutil
 
-class ReevaluationOfPriorEvidence:
-    def __init__(self, causing_evidence_postion, prior_evidence_positions_to_be_updated, variance_h_1, variance_h_2):
-        self.causing_evidence_postion = causing_evidence_postion
-        self.prior_evidence_positions_to_be_updated = prior_evidence_positions_to_be_updated
-        self.variance_h_1 = variance_h_1
-        self.variance_h_2 = variance_h_2
-
-
-class BayesItem:
-    """
-    The item we'll calculate on
-    """
-
-    def __init__(self, position, likelihood_h_1, prior_h_1, likelihood_h_2, prior_h_2):
-        self.position = position
-        self.likelihood_h_1 = likelihood_h_1
-        self.likelihood_h_2 = likelihood_h_2
-        self.prior_h_1 = prior_h_1
-        self.prior_h_2 = prior_h_2
-        self.posterior_h_1 = 0.0
-        self.posterior_h_2 = 0.0
-        self.calculate_posterior()
-
-    def calculate_posterior(self):
-        """
-        Bayes calculation e.g.
-                             Likelihood(H_1)	    Prior(H_1)	      Likelihood(MG)	      Prior(H1)	        Likelihood(MB)	       Prior(H2)
-        """
-        if(((self.likelihood_h_1 * self.prior_h_1) + (self.likelihood_h_2 * self.prior_h_2)) > 0):
-            self.posterior_h_1 = (self.likelihood_h_1 * self.prior_h_1) / ((self.likelihood_h_1 * self.prior_h_1) + (self.likelihood_h_2 * self.prior_h_2))
-        else:
-            self.posterior_h_1 = 0
-        if(((self.likelihood_h_2 * self.prior_h_2) + (self.likelihood_h_1 * self.prior_h_1)) > 0):
-            self.posterior_h_2 = (self.likelihood_h_2 * self.prior_h_2) / ((self.likelihood_h_2 * self.prior_h_2) + (self.likelihood_h_1 * self.prior_h_1))
-        else:
-            self.posterior_h_2 = 0
+from momentum import reference
+from momentum.debug import RAW_HEADER, write_raw, write_reevaluations
+from momentum.stream import write_results
 
-        self.posterior_h_1 = normalize(self.posterior_h_1)
-        self.posterior_h_2 = normalize(self.posterior_h_2)
+ITERATIONS = 2000
+PRIOR_H_1 = .5
+PRIOR_H_2 = .5
 
 
 def iterative(stuxnet=False):
@@ -63,11 +29,9 @@ def iterative(stuxnet=False):
     chance_of_reset = 5
 
     likelihood_h_1 = .50
-    prior_h_1 = .50
     likelihood_h_2 = .50
-    prior_h_2 = .50
 
-    items = []
+    likelihoods = []
     resets = []
     print("")
     count_resets = 0
@@ -79,7 +43,6 @@ def iterative(stuxnet=False):
         P(f) = c(x(t)) * .001 every t there is a chance of wear
         every x(t) % of manual check, resets P(f) to 0
         """
-        has_processed = False
         likelihood_increases = percent_of_the_time(chance_likelihood_increases)
         if likelihood_increases:
             likelihood_h_1 = likelihood_h_1 + .000575
@@ -97,28 +60,11 @@ def iterative(stuxnet=False):
             likelihood_h_1 = likelihood_h_1 - .02
             likelihood_h_2 = 1 - likelihood_h_1
 
-        original_likelihood_h_1 = likelihood_h_1
-        original_likelihood_h_2 = likelihood_h_2
-
-        likelihood_h_1 = original_likelihood_h_1
-        likelihood_h_2 = original_likelihood_h_2
-
         # now how to incorporate the lookback with resets and such
 
-        b = BayesItem(i, likelihood_h_1, prior_h_1, likelihood_h_2, prior_h_2)
-        items.append(b)
-        prior_h_1 = b.posterior_h_1
-        prior_h_2 = b.posterior_h_2
+        likelihoods.append((likelihood_h_1, likelihood_h_2))
     print("\nresets {} stuxnet {}".format(count_resets, count_stuxnet))
-    return items
-
-
-def normalize(n):
-    if n > 1:
-        n = 1
-    if n < 0:
-        n = 0
-    return n
+    return reference.chain(likelihoods, .50, .50)
 
 
 def percent():
@@ -130,7 +76,9 @@ def percent_of_the_time(p: int):
     return x < p
 
 
-print("""
+def main(banner=True):
+    if banner:
+        print("""
  ________  ____    ____
 |_   __  ||_   \  /   _|
   | |_ \_|  |   \/   |
@@ -139,59 +87,22 @@ print("""
 |________||_____||_____|
                          """)
 
-getcontext().prec = 5
+    # ten runs without stuxnet, the last with it
+    results = [iterative() for run in range(10)]
+    results.append(iterative(True))
+
+    if os.path.isdir("output"):
+        shutil.rmtree("output")
+    os.makedirs("output")
+
+    # nothing reevaluates here, the debug files are only their headers
+    write_results("output/results.txt", *results)
+    write_reevaluations("output/output_reevals.txt", [])
+    write_raw("output/output_raw_debug.txt", [], RAW_HEADER)
+
+    print("Results written successfully")
+    return "output/results.txt"
 
-ITERATIONS = 2000
-PRIOR_H_1 = .5
-PRIOR_H_2 = .5
 
-DEBUG = True
-DEBUG_RAW = []
-DEBUG_REEVALS = []
-
-# i want to build the array of E and their likelihoods here, and pass them into a simple function of calculation....
-results1 = iterative()
-results2 = iterative()
-results3 = iterative()
-results4 = iterative()
-results5 = iterative()
-results6 = iterative()
-results7 = iterative()
-results8 = iterative()
-results9 = iterative() # stuxnet=False
-results10 = iterative()
-results11 = iterative(True)
-
-
-if os.path.isdir("output"):
-    shutil.rmtree("output")
-os.makedirs("output")
-
-with open("output/results.txt", "w") as f:
-    # f.write("E  ,Bayes,Single,Iterative,LookbackSingle,LookbackIterative\n")
-    for i in range(ITERATIONS):
-        f.write("{0:03d}".format(i) + "," +
-                "{:5f}".format(results1[i].posterior_h_1) + "," +
-                "{:5f}".format(results2[i].posterior_h_1) + "," +
-                "{:5f}".format(results3[i].posterior_h_1) + "," +
-                "{:5f}".format(results4[i].posterior_h_1) + "," +
-                "{:5f}".format(results5[i].posterior_h_1) + "," +
-                "{:5f}".format(results6[i].posterior_h_1) + "," +
-                "{:5f}".format(results7[i].posterior_h_1) + "," +
-                "{:5f}".format(results8[i].posterior_h_1) + "," +
-                "{:5f}".format(results9[i].posterior_h_1) + "," +
-                "{:5f}".format(results10[i].posterior_h_1) + "," +
-                "{:5f}".format(results11[i].posterior_h_1) + "\n")
-
-with open("output/output_reevals.txt", "w") as f:
-    f.write("causing_evidence_postion, prior_evidence_positions_to_be_updated, variance_h_1, variance_h_2")
-    for r in DEBUG_REEVALS:
-        f.write(str(r.causing_evidence_postion) + "," + str(r.prior_evidence_positions_to_be_updated) + "," + str(r.variance_h_1) + "," + str(r.variance_h_2) + "\n")
-
-with open("output/output_raw_debug.txt", "w") as f:
-    f.write("i,iter,likelihood_h_1,prior_h_1,b.posterior_h_1,prior_h_2,posterior_h_2")
-    for o in DEBUG_RAW:
-        f.write(o + "\n")
-
-print("Results written successfully")
-exit(0)
+if __name__ == "__main__":
+    main()
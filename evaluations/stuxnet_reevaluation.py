@@ -2,10 +2,13 @@
 
 import os
 import shutil
-from decimal import *
 import random
 from datetime import datetime
 
+from momentum import ReevaluationOfPriorEvidence
+from momentum.ratios import probability, uniform_replay
+from momentum.reference import BayesItem
+
 """
 Industrial control systems, computer software and certainly sophisticated malware are subject 
 to many different input values, and so we attempt to simulate two competing pieces of evidence 
@@ -13,48 +16,7 @@ for the same hypothesis H_1, one of high probability and one of low.
 """
 
 
-class ReevaluationOfPriorEvidence:
-    def __init__(self, causing_evidence_postion, prior_evidence_positions_to_be_updated, variance_h_1, variance_h_2):
-        self.causing_evidence_postion = causing_evidence_postion
-        self.prior_evidence_positions_to_be_updated = prior_evidence_positions_to_be_updated
-        self.variance_h_1 = variance_h_1
-        self.variance_h_2 = variance_h_2
-
-
-class BayesItem:
-    """
-    The item we'll calculate on
-    """
-
-    def __init__(self, position, likelihood_h_1, prior_h_1, likelihood_h_2, prior_h_2):
-        self.position = position
-        self.likelihood_h_1 = likelihood_h_1
-        self.likelihood_h_2 = likelihood_h_2
-        self.prior_h_1 = prior_h_1
-        self.prior_h_2 = prior_h_2
-        self.posterior_h_1 = 0.0
-        self.posterior_h_2 = 0.0
-        self.calculate_posterior()
-
-    def calculate_posterior(self):
-        """
-        Bayes calculation e.g.
-                             Likelihood(H_1)	    Prior(H_1)	      Likelihood(MG)	      Prior(H1)	        Likelihood(MB)	       Prior(H2)
-        """
-        if(((self.likelihood_h_1 * self.prior_h_1) + (self.likelihood_h_2 * self.prior_h_2)) > 0):
-            self.posterior_h_1 = (self.likelihood_h_1 * self.prior_h_1) / ((self.likelihood_h_1 * self.prior_h_1) + (self.likelihood_h_2 * self.prior_h_2))
-        else:
-            self.posterior_h_1 = 0
-        if(((self.likelihood_h_2 * self.prior_h_2) + (self.likelihood_h_1 * self.prior_h_1)) > 0):
-            self.posterior_h_2 = (self.likelihood_h_2 * self.prior_h_2) / ((self.likelihood_h_2 * self.prior_h_2) + (self.likelihood_h_1 * self.prior_h_1))
-        else:
-            self.posterior_h_2 = 0
-
-        self.posterior_h_1 = normalize(self.posterior_h_1)
-        self.posterior_h_2 = normalize(self.posterior_h_2)
-
-
-def iterative(stuxnet=False, lookback=9999, sere = False):
+def iterative(stuxnet=False, lookback=9999, sere = False, trace=None):
     """
     Continue to update in the same one fashion until convergence
     So for each iteration above our belief change, we recalculate likelihoods
@@ -109,37 +71,21 @@ def iterative(stuxnet=False, lookback=9999, sere = False):
         if(i >= lookback):
             reevaluation = ReevaluationOfPriorEvidence(lookback, [], .501, .499)
 
-            for update_count, item in enumerate(items):
-                print("Reevaluating {}:{}...".format(i, update_count), end='\r')
-                # previous E originals
-                item_original_likelihood_h_1 = item.likelihood_h_1
-                item_original_likelihood_h_2 = item.likelihood_h_2
-                if update_count == 0:
-                    prior_h_1 = item.prior_h_1
-                    prior_h_2 = item.prior_h_2
-
-                likelihood_h_1 = item_original_likelihood_h_1
-                likelihood_h_2 = item_original_likelihood_h_2
-
-                # is this a previous E to reevaluate?
-                likelihood_h_1 = normalize(reevaluation.variance_h_1)
-                likelihood_h_2 = normalize(reevaluation.variance_h_2)
-
-                lookback_item = BayesItem(update_count, likelihood_h_1, prior_h_1, likelihood_h_2, prior_h_2)
-
-                # if is_debug:
-                #     DEBUG_RAW.append("{0:03d}".format(i) + "," +
-                #                      "{0:03d}".format(update_count) + "," +
-                #                      str(likelihood_h_1) + "," +
-                #                      "{:5f}".format(prior_h_1) + "," +
-                #                      "{:5f}".format(lookback_item.posterior_h_1) + "," +
-                #                      "{:5f}".format(prior_h_2) + "," +
-                #                      "{:5f}".format(lookback_item.posterior_h_2) + "," +
-                #                      str(reevaluation.causing_evidence_postion) + "," +
-                #                      str(reevaluation.prior_evidence_positions_to_be_updated))
-
-                prior_h_1 = lookback_item.posterior_h_1
-                prior_h_2 = lookback_item.posterior_h_2
+            if items:
+                # every earlier E is reevaluated to the same pair, so the replay is the
+                # first prior times that pair's ratio to the power len(items), no loop
+                odds = uniform_replay(items[0].prior_h_1, items[0].prior_h_2,
+                                      reevaluation.variance_h_1, reevaluation.variance_h_2, len(items))
+
+                # replayed posteriors are only kept when asked for
+                if trace is not None:
+                    for update_count in range(len(items)):
+                        replayed = uniform_replay(items[0].prior_h_1, items[0].prior_h_2,
+                                                  reevaluation.variance_h_1, reevaluation.variance_h_2, update_count + 1)
+                        trace.append((i, update_count, probability(replayed), probability(-replayed)))
+
+                prior_h_1 = probability(odds)
+                prior_h_2 = probability(-odds)
 
         likelihood_h_1 = original_likelihood_h_1
         likelihood_h_2 = original_likelihood_h_2
@@ -153,12 +99,8 @@ def iterative(stuxnet=False, lookback=9999, sere = False):
     return items
 
 
-def normalize(n):
-    if n > 1:
-        n = 1
-    if n < 0:
-        n = 0
-    return n
+# the experiment is main() this many times over, each run writing its own files
+RUNS = 100
 
 
 def percent():
@@ -169,8 +111,10 @@ def percent_of_the_time(p: int):
     x = percent()
     return x < p
 
-def main():
-    print("""
+
+def main(banner=True):
+    if banner:
+        print("""
     ________  ____    ____
     |_   __  ||_   \  /   _|
     | |_ \_|  |   \/   |
@@ -179,8 +123,6 @@ def main():
     |________||_____||_____|
                             """)
 
-    getcontext().prec = 5
-
     ITERATIONS = 2000
     PRIOR_H_1 = .5
     PRIOR_H_2 = .5
@@ -207,7 +149,8 @@ def main():
 
     date = datetime.now().strftime("%Y_%m_%d-%I:%M:%S_%p")
 
-    with open("output/stuxnet_reevaluation_results_{}.txt".format(date), "w") as f:
+    results = "output/stuxnet_reevaluation_results_{}.txt".format(date)
+    with open(results, "w") as f:
         # f.write("E  ,Bayes,Single,Iterative,LookbackSingle,LookbackIterative\n")
         for i in range(ITERATIONS):
             f.write("{0:03d}".format(i) + "," +
@@ -234,6 +177,9 @@ def main():
             f.write(o + "\n")
 
     print("Results written successfully")
+    return results
+
 
-for i in range(100):
-    main()
+if __name__ == "__main__":
+    for i in range(RUNS):
+        main()